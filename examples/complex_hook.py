@@ -1,13 +1,16 @@
 # examples/complex_hook.py
+import asyncio
+import importlib.util
+import logging
+import queue
+import re
+from functools import singledispatch
+from logging.handlers import QueueHandler, QueueListener
 from waspnest import State, Skill, Agent, skill
 from waspnest.hooks import HookPoint
 from pydantic import BaseModel
-import instructor
-from openai import OpenAI
-from dotenv import load_dotenv
-from datetime import datetime
 
-load_dotenv()
+logger = logging.getLogger("waspnest")
 
 
 # State definitions
@@ -29,86 +32,184 @@ class DetailedResponse(BaseModel):
 
 # Smart skill that gives simple or detailed responses
 class SmartAnswerSkill(Skill):
+    _COMPLEXITY_RE = re.compile(
+        r"\b(?:why|how|explain|describe|compare|analyze|difference)\b", re.IGNORECASE
+    )
+    _LONG_THRESHOLD = 6
+    _SPECULATIVE_CONFIDENCE = 0.7
+
     @skill
     def execute(self, state: State[Query]) -> State[SimpleResponse | DetailedResponse]:
         # Analyze query complexity first
         complexity = self.analyze_complexity(state.data.text)
 
         if complexity > 0.7:  # Complex query needs detailed response
-            result = self.ask(
-                prompt=f"Give a detailed answer with explanation and references for: {state.data.text}",
-                response_model=DetailedResponse,
-                system_prompt="You are a helpful expert. Provide detailed answers with explanations and references.",
-            )
+            result = self.ask(**self.detailed_request(state.data.text))
         else:  # Simple query gets simple response
-            result = self.ask(
-                prompt=state.data.text,
-                response_model=SimpleResponse,
-                system_prompt="You are a helpful assistant. Provide clear, concise answers.",
-            )
+            result = self.ask(**self.simple_request(state.data.text))
+
+        return state.with_data(result)
+
+    async def aexecute(self, state: State) -> State:
+        # Borderline queries request both answers at once; the rest are
+        # routed exactly as in execute
+        if self.can_speculate() and self.is_borderline(state.data.text):
+            return state.with_data(await self.speculate(state.data.text))
+        return await super().aexecute(state)
+
+    def can_speculate(self) -> bool:
+        # Without an async client the losing request runs in a worker thread
+        # that can't be cancelled, so speculation would only add latency
+        return self.agent.speculative and self.agent.async_client is not None
+
+    async def speculate(self, text: str) -> SimpleResponse | DetailedResponse:
+        """Keep the simple answer if confident, otherwise wait for the detailed one."""
+        simple_task = asyncio.create_task(self.aask(**self.simple_request(text)))
+        detailed_task = asyncio.create_task(self.aask(**self.detailed_request(text)))
+
+        simple = await simple_task
+        if simple.confidence >= self._SPECULATIVE_CONFIDENCE:
+            detailed_task.cancel()
+            return simple
+        return await detailed_task
+
+    def simple_request(self, text: str) -> dict:
+        return dict(
+            prompt=text,
+            response_model=SimpleResponse,
+            system_prompt="You are a helpful assistant. Provide clear, concise answers.",
+        )
 
-        return State(result, context=state.context)
+    def detailed_request(self, text: str) -> dict:
+        return dict(
+            prompt=f"Give a detailed answer with explanation and references for: {text}",
+            response_model=DetailedResponse,
+            system_prompt="You are a helpful expert. Provide detailed answers with explanations and references.",
+            cache_policy="exact",  # Never reuse a detailed answer for a paraphrase
+        )
 
     def analyze_complexity(self, text: str) -> float:
         """Simple complexity analysis based on text length and question words."""
-        complexity_words = {
-            "why",
-            "how",
-            "explain",
-            "describe",
-            "compare",
-            "analyze",
-            "difference",
-        }
-        words = text.lower().split()
-
-        # Check length and presence of complexity indicators
-        has_complexity_words = any(word in complexity_words for word in words)
-        is_long = len(words) > 6
+        # Long queries (more than 6 words) with a complexity indicator
+        is_long = text.count(" ") >= self._LONG_THRESHOLD
+        return 0.8 if (is_long and self._COMPLEXITY_RE.search(text)) else 0.5
 
-        return 0.8 if (has_complexity_words and is_long) else 0.5
+    def is_borderline(self, text: str) -> bool:
+        """Short queries with a complexity indicator: these get a simple answer
+        but might have needed a detailed one."""
+        is_long = text.count(" ") >= self._LONG_THRESHOLD
+        return not is_long and self._COMPLEXITY_RE.search(text) is not None
 
 
 # Hook functions
 def log_execution_start(state: State):
-    print(f"\n[{datetime.now()}] Starting execution with query: {state.data.text}")
-    print(f"Initial context: {state.context}")
+    logger.info(
+        "Starting execution with query: %s\nInitial context: %s",
+        state.data.text,
+        state.context,
+    )
 
 
 def log_skill_start(skill: Skill, state: State):
-    print(f"\n[{datetime.now()}] Starting skill: {skill.name}")
-    print(f"Current step: {state.context.get('current_step', 'initial')}")
+    logger.info(
+        "Starting skill: %s\nCurrent step: %s",
+        skill.name,
+        state.current_step,
+    )
+
+
+@singledispatch
+def log_response(data: BaseModel, skill: Skill):
+    logger.info(
+        "Completed skill: %s\nGenerated simple response with confidence: %s",
+        skill.name,
+        data.confidence,
+    )
+
+
+@log_response.register
+def _(data: DetailedResponse, skill: Skill):
+    logger.info(
+        "Completed skill: %s\nGenerated detailed response with %d references\n"
+        "Confidence: %s",
+        skill.name,
+        len(data.references),
+        data.confidence,
+    )
 
 
 def log_skill_end(skill: Skill, state: State):
-    print(f"\n[{datetime.now()}] Completed skill: {skill.name}")
-    if isinstance(state.data, DetailedResponse):
-        print(
-            f"Generated detailed response with {len(state.data.references)} references"
-        )
-        print(f"Confidence: {state.data.confidence}")
-    else:
-        print(f"Generated simple response with confidence: {state.data.confidence}")
+    log_response(state.data, skill)
 
 
 def log_llm_request(**kwargs):
-    print(f"\n[{datetime.now()}] LLM Request:")
-    print(f"System prompt: {kwargs['messages'][0]['content']}")
-    print(f"User prompt: {kwargs['messages'][1]['content']}")
+    logger.info(
+        "LLM Request:\nSystem prompt: %s\nUser prompt: %s",
+        kwargs["messages"][0]["content"],
+        kwargs["messages"][1]["content"],
+    )
 
 
-def log_error(exception: Exception, skill: Skill, state: State):
-    print(f"\n[{datetime.now()}] Error in skill {skill.name}:")
-    print(f"Error: {str(exception)}")
-    print(f"State context: {state.context}")
+def log_error(exception: Exception, skill: Skill = None, state: State = None, **kwargs):
+    logger.error(
+        "Error in skill %s:\nError: %s\nState context: %s",
+        skill.name if skill else None,
+        exception,
+        state.context if state else None,
+    )
 
 
-def main():
-    # Create instructor client
-    client = instructor.from_openai(OpenAI())
+class DeferredQueueHandler(QueueHandler):
+    """Enqueue records unformatted; the listener formats them."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
 
-    # Create agent with skill
-    agent = Agent(skills=[SmartAnswerSkill()], client=client)
+def setup_logging() -> QueueListener:
+    """Route hook logs through a queue so formatting and stdout writes happen
+    on the listener thread instead of inside Agent.execute."""
+    log_queue = queue.Queue(-1)
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("\n[%(asctime)s] %(message)s"))
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
+def main():
+    # Heavy client libraries are only needed when the example actually runs
+    import httpx
+    import instructor
+    from dotenv import load_dotenv
+    from openai import AsyncOpenAI, OpenAI
+
+    load_dotenv()
+    listener = setup_logging()
+
+    # Create instructor client on a pooled connection shared by all skills,
+    # using HTTP/2 when the h2 package is installed (pip install "httpx[http2]")
+    http2 = importlib.util.find_spec("h2") is not None
+    limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    http_client = httpx.Client(http2=http2, limits=limits, timeout=30)
+    client = instructor.from_openai(OpenAI(http_client=http_client))
+
+    # Create agent with skill. Speculative mode races the simple and detailed
+    # answers for borderline queries; the async client lets the loser be cancelled.
+    agent = Agent(
+        skills=[SmartAnswerSkill()],
+        client=client,
+        async_client=instructor.from_openai(
+            AsyncOpenAI(
+                http_client=httpx.AsyncClient(http2=http2, limits=limits, timeout=30)
+            )
+        ),
+        speculative=True,
+    )
 
     # Register hooks
     agent.hooks.on(HookPoint.PRE_EXECUTE, log_execution_start)
@@ -131,20 +232,26 @@ def main():
         context={"user_id": "456", "priority": "high"},
     )
 
-    print("\n=== Testing Simple Query ===")
-    simple_result = agent.execute(simple_state)
-    print("\nSimple Result:")
-    print(f"Answer: {simple_result.data.answer}")
-    print(f"Confidence: {simple_result.data.confidence}")
-
-    print("\n=== Testing Complex Query ===")
-    complex_result = agent.execute(complex_state)
-    print("\nComplex Result:")
-    print(f"Answer: {complex_result.data.answer}")
-    if isinstance(complex_result.data, DetailedResponse):
-        print(f"Explanation: {complex_result.data.explanation}")
-        print(f"References: {', '.join(complex_result.data.references)}")
-    print(f"Confidence: {complex_result.data.confidence}")
+    # Speculation only applies to async execution
+    async def run_queries():
+        print("\n=== Testing Simple Query ===")
+        simple_result = await agent.aexecute(simple_state)
+        print("\nSimple Result:")
+        print(f"Answer: {simple_result.data.answer}")
+        print(f"Confidence: {simple_result.data.confidence}")
+
+        print("\n=== Testing Complex Query ===")
+        complex_result = await agent.aexecute(complex_state)
+        print("\nComplex Result:")
+        print(f"Answer: {complex_result.data.answer}")
+        if isinstance(complex_result.data, DetailedResponse):
+            print(f"Explanation: {complex_result.data.explanation}")
+            print(f"References: {', '.join(complex_result.data.references)}")
+        print(f"Confidence: {complex_result.data.confidence}")
+
+    asyncio.run(run_queries())
+
+    listener.stop()
 
 
 if __name__ == "__main__":
@@ -1,11 +1,7 @@
 # examples/simple.py
+import importlib.util
 from pydantic import BaseModel
 from waspnest import State, Skill, Agent, skill
-import instructor
-from dotenv import load_dotenv
-from openai import OpenAI
-
-load_dotenv()
 
 
 # State definitions
@@ -42,6 +38,15 @@ class QueryAnalyzer(Skill):
         )
         return State(result)
 
+    def execute_batch(self, states: list[State]) -> list[State]:
+        # Analyze all queries with a single LLM call
+        results = self.ask_batch(
+            prompts=[state.data.text for state in states],
+            response_model=Analysis,
+            system_prompt="Analyze the query for intent and confidence.",
+        )
+        return [State(result) for result in results]
+
 
 class ResponseGenerator(Skill):
     @skill
@@ -57,8 +62,19 @@ class ResponseGenerator(Skill):
 
 
 def main():
-    # Create instructor client
-    client = instructor.from_openai(OpenAI())
+    # Heavy client libraries are only needed when the example actually runs
+    import httpx
+    import instructor
+    from dotenv import load_dotenv
+    from openai import OpenAI
+
+    load_dotenv()
+    # Create instructor client on a pooled connection shared by all skills,
+    # using HTTP/2 when the h2 package is installed (pip install "httpx[http2]")
+    http2 = importlib.util.find_spec("h2") is not None
+    limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    http_client = httpx.Client(http2=http2, limits=limits, timeout=30)
+    client = instructor.from_openai(OpenAI(http_client=http_client))
 
     # Create agent with skills
     agent = Agent(skills=[QueryAnalyzer(), ResponseGenerator()], client=client)
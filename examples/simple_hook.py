@@ -1,13 +1,13 @@
 # examples/simple_hook.py
+import importlib.util
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from waspnest import State, Skill, Agent, skill
 from waspnest.hooks import HookPoint
 from pydantic import BaseModel
-import instructor
-from openai import OpenAI
-from dotenv import load_dotenv
-from datetime import datetime
 
-load_dotenv()
+logger = logging.getLogger("waspnest")
 
 
 # State definitions
@@ -29,40 +29,92 @@ class AnswerSkill(Skill):
             response_model=Response,
             system_prompt="You are a helpful assistant.",
         )
-        return State(result, context=state.context)
+        return state.with_data(result)
 
 
 # Hook functions
 def log_execution_start(state: State):
-    print(f"\n[{datetime.now()}] Starting execution with query: {state.data.text}")
-    print(f"Initial context: {state.context}")
+    logger.info(
+        "Starting execution with query: %s\nInitial context: %s",
+        state.data.text,
+        state.context,
+    )
 
 
 def log_skill_start(skill: Skill, state: State):
-    print(f"\n[{datetime.now()}] Starting skill: {skill.name}")
-    print(f"Step {state.context.get('current_step', 'initial')}")
+    logger.info(
+        "Starting skill: %s\nStep %s",
+        skill.name,
+        state.current_step,
+    )
 
 
 def log_skill_end(skill: Skill, state: State):
-    print(f"\n[{datetime.now()}] Completed skill: {skill.name}")
-    print(f"Result confidence: {state.data.confidence}")
+    logger.info(
+        "Completed skill: %s\nResult confidence: %s", skill.name, state.data.confidence
+    )
 
 
 def log_llm_request(**kwargs):
-    print(f"\n[{datetime.now()}] LLM Request:")
-    print(f"System prompt: {kwargs['messages'][0]['content']}")
-    print(f"User prompt: {kwargs['messages'][1]['content']}")
+    logger.info(
+        "LLM Request:\nSystem prompt: %s\nUser prompt: %s",
+        kwargs["messages"][0]["content"],
+        kwargs["messages"][1]["content"],
+    )
+
+
+def log_llm_token(skill: Skill, delta: str):
+    # Deltas are fragments of the response JSON, e.g. '{"answer":"To res'
+    logger.info("Streamed JSON from %s: %s", skill.name, delta)
+
+
+def log_error(exception: Exception, skill: Skill = None, state: State = None, **kwargs):
+    logger.error(
+        "Error in skill %s:\nError: %s\nState context: %s",
+        skill.name if skill else None,
+        exception,
+        state.context if state else None,
+    )
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueue records unformatted; the listener formats them."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
 
+def setup_logging() -> QueueListener:
+    """Route hook logs through a queue so formatting and stdout writes happen
+    on the listener thread instead of inside Agent.execute."""
+    log_queue = queue.Queue(-1)
+    logger.addHandler(DeferredQueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
 
-def log_error(exception: Exception, skill: Skill, state: State):
-    print(f"\n[{datetime.now()}] Error in skill {skill.name}:")
-    print(f"Error: {str(exception)}")
-    print(f"State context: {state.context}")
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("\n[%(asctime)s] %(message)s"))
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
 
 
 def main():
-    # Create instructor client
-    client = instructor.from_openai(OpenAI())
+    # Heavy client libraries are only needed when the example actually runs
+    import httpx
+    import instructor
+    from dotenv import load_dotenv
+    from openai import OpenAI
+
+    load_dotenv()
+    listener = setup_logging()
+
+    # Create instructor client on a pooled connection shared by all skills,
+    # using HTTP/2 when the h2 package is installed (pip install "httpx[http2]")
+    http2 = importlib.util.find_spec("h2") is not None
+    limits = httpx.Limits(max_keepalive_connections=32, max_connections=64)
+    http_client = httpx.Client(http2=http2, limits=limits, timeout=30)
+    client = instructor.from_openai(OpenAI(http_client=http_client))
 
     # Create agent with skill
     agent = Agent(skills=[AnswerSkill()], client=client)
@@ -72,6 +124,7 @@ def main():
     agent.hooks.on(HookPoint.SKILL_START, log_skill_start)
     agent.hooks.on(HookPoint.SKILL_END, log_skill_end)
     agent.hooks.on(HookPoint.LLM_REQUEST, log_llm_request)
+    agent.hooks.on(HookPoint.LLM_TOKEN, log_llm_token)
     agent.hooks.on(HookPoint.ERROR, log_error)
 
     # Create initial state
@@ -82,6 +135,7 @@ def main():
 
     # Execute
     final_state = agent.execute(initial_state)
+    listener.stop()  # Flush pending log records
 
     # Print final result
     print(f"\nFinal Answer: {final_state.data.answer}")
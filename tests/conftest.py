@@ -27,7 +27,7 @@ class AnalyzerSkill(Skill):
         result = IntermediateOutput(
             analysis=f"Analyzed: {state.data.text}", confidence=0.9
         )
-        return State(data=result, context=state.context, metadata=state.metadata)
+        return state.with_data(result)
 
 
 class ResponderSkill(Skill):
@@ -36,7 +36,7 @@ class ResponderSkill(Skill):
         result = FinalOutput(
             response=f"Response for: {state.data.analysis}", confidence=0.95
         )
-        return State(data=result, context=state.context, metadata=state.metadata)
+        return state.with_data(result)
 
 
 # Shared Fixtures
@@ -1,7 +1,16 @@
 # tests/test_agent.py
-from waspnest import Agent, State, Skill, skill
+import asyncio
+import threading
+import pytest
+from waspnest import Agent, State, Skill, skill, SKILL_SKIP
 from waspnest.hooks import HookPoint
-from conftest import QueryInput, IntermediateOutput, FinalOutput
+from conftest import (
+    QueryInput,
+    IntermediateOutput,
+    FinalOutput,
+    AnalyzerSkill,
+    ResponderSkill,
+)
 
 
 def test_agent_initialization(sample_agent, analyzer_skill, responder_skill):
@@ -83,3 +92,414 @@ def test_agent_hook_integration(sample_agent, sample_state):
     assert len(hook_calls) == 2
     assert hook_calls[0] == sample_state  # PRE_EXECUTE
     assert hook_calls[1] == final_state  # POST_EXECUTE
+
+
+def test_agent_execute_parallel(sample_agent):
+    """Test parallel execution chain preserves per-state hook order"""
+    events = []
+
+    def record(point):
+        def hook(**kwargs):
+            events.append((kwargs["state"].context["request"], point))
+
+        return hook
+
+    for point in (
+        HookPoint.PRE_EXECUTE,
+        HookPoint.SKILL_START,
+        HookPoint.SKILL_END,
+        HookPoint.POST_EXECUTE,
+    ):
+        sample_agent.hooks.on(point, record(point))
+
+    states = [
+        State(QueryInput(text=f"query {i}"), context={"request": i}) for i in range(4)
+    ]
+    results = sample_agent.execute_parallel(states)
+
+    assert len(results) == 4
+    for i, final_state in enumerate(results):
+        assert isinstance(final_state.data, FinalOutput)
+        assert final_state.data.response == f"Response for: Analyzed: query {i}"
+        assert final_state.context["total_steps"] == 2
+        assert [point for request, point in events if request == i] == [
+            HookPoint.PRE_EXECUTE,
+            HookPoint.SKILL_START,
+            HookPoint.SKILL_END,
+            HookPoint.SKILL_START,
+            HookPoint.SKILL_END,
+            HookPoint.POST_EXECUTE,
+        ]
+
+
+def test_agent_fan_out(mock_client, sample_state):
+    """Test independent skills run concurrently on the same state"""
+    barrier = threading.Barrier(2, timeout=5)
+
+    class ResearcherSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            barrier.wait()
+            return State(IntermediateOutput(analysis="research", confidence=0.7))
+
+    class CoderSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            barrier.wait()
+            return State(IntermediateOutput(analysis="code", confidence=0.6))
+
+    researcher, coder = ResearcherSkill(), CoderSkill()
+    agent = Agent(skills=[researcher, coder], client=mock_client)
+    results = agent.fan_out([researcher, coder], sample_state)
+
+    assert [r.data.analysis for r in results] == ["research", "code"]
+    assert [r.context["last_skill"] for r in results] == [
+        "ResearcherSkill",
+        "CoderSkill",
+    ]
+
+
+def test_agent_async_parallel_helpers(sample_agent, sample_state):
+    """Test the async parallel helpers run inside a loop and fan-out leaves
+    skill.agent alone"""
+    other = Agent(skills=[AnalyzerSkill()], client=sample_agent.client)
+    foreign = other.skills[0]
+
+    async def run():
+        states = await sample_agent.aexecute_parallel([sample_state])
+        fanned = await sample_agent.afan_out(sample_agent.skills[:1], sample_state)
+        with pytest.raises(RuntimeError, match="not attached to this agent"):
+            await sample_agent.afan_out([foreign], sample_state)
+        return states + fanned
+
+    final_state, fanned = asyncio.run(run())
+
+    assert isinstance(final_state.data, FinalOutput)
+    assert fanned.data.analysis == "Analyzed: test query"
+    assert foreign.agent is other
+
+
+def test_agent_execute_batch(sample_agent, analyzer_skill):
+    """Test batched execution groups states sharing the next skill"""
+    batch_sizes = []
+    execute_batch = analyzer_skill.execute_batch
+
+    def tracking_execute_batch(states):
+        batch_sizes.append(len(states))
+        return execute_batch(states)
+
+    analyzer_skill.execute_batch = tracking_execute_batch
+    states = [State(QueryInput(text=f"query {i}")) for i in range(3)]
+    states.append(State(IntermediateOutput(analysis="partial", confidence=0.5)))
+
+    results = sample_agent.execute_batch(states, context={"session_id": "s"})
+
+    assert batch_sizes == [3]
+    assert [r.data.response for r in results] == [
+        "Response for: Analyzed: query 0",
+        "Response for: Analyzed: query 1",
+        "Response for: Analyzed: query 2",
+        "Response for: partial",
+    ]
+    assert [r.context["total_steps"] for r in results] == [2, 2, 2, 1]
+    assert all(r.context["session_id"] == "s" for r in results)
+
+
+def test_agent_execute_batch_isolates_failures(mock_client):
+    """Test one failing state doesn't discard the rest of its batch"""
+
+    class PickyAnalyzer(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            if state.data.text == "bad":
+                raise ValueError("bad input")
+            return state.with_data(IntermediateOutput(analysis="ok", confidence=0.9))
+
+    errors = []
+    agent = Agent(skills=[PickyAnalyzer()], client=mock_client)
+    agent.hooks.on(
+        HookPoint.ERROR, lambda state, **kwargs: errors.append(state.context["error"])
+    )
+
+    good, bad = agent.execute_batch(
+        [State(QueryInput(text="good")), State(QueryInput(text="bad"))]
+    )
+
+    assert good.data == IntermediateOutput(analysis="ok", confidence=0.9)
+    assert good.context["total_steps"] == 1
+    assert "error" not in good.context
+    assert isinstance(bad.data, QueryInput)
+    assert bad.context["error"] == "bad input"
+    assert errors == ["bad input"]
+
+
+def test_agent_execute_batch_falls_back_to_next_skill(mock_client):
+    """Test declined and failed batches move on to the next capable skill"""
+
+    class DecliningSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            return SKILL_SKIP
+
+    class FailingSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            raise ValueError("Test error")
+
+    for first in (DecliningSkill(), FailingSkill()):
+        agent = Agent(skills=[first, AnalyzerSkill()], client=mock_client)
+        results = agent.execute_batch(
+            [State(QueryInput(text="a")), State(QueryInput(text="b"))]
+        )
+
+        assert [r.data.analysis for r in results] == ["Analyzed: a", "Analyzed: b"]
+        assert all(r.context["last_skill"] == "AnalyzerSkill" for r in results)
+        assert all(r.context["total_steps"] == 1 for r in results)
+        assert all("error" not in r.context for r in results)
+
+
+def test_agent_execute_batch_length_mismatch(sample_agent, analyzer_skill):
+    """Test a batch returning the wrong number of states is retried per state"""
+    analyzer_skill.execute_batch = lambda states: states[:1]
+
+    results = sample_agent.execute_batch(
+        [State(QueryInput(text="a")), State(QueryInput(text="b"))], max_steps=1
+    )
+
+    assert [r.data.analysis for r in results] == ["Analyzed: a", "Analyzed: b"]
+
+
+def test_agent_sets_current_step(sample_agent, sample_state):
+    """Test skills see the current step on the state"""
+    steps = []
+    sample_agent.hooks.on(
+        HookPoint.SKILL_START, lambda skill, state: steps.append(state.current_step)
+    )
+
+    sample_agent.execute(sample_state)
+
+    assert steps == [0, 1]
+
+
+def test_agent_aexecute_chain(sample_agent, sample_state):
+    """Test async execution matches the sync execution chain"""
+    final_state = asyncio.run(sample_agent.aexecute(sample_state))
+
+    assert isinstance(final_state.data, FinalOutput)
+    assert final_state.context["total_steps"] == 2
+    assert final_state.context["user_id"] == "123"
+
+
+def test_agent_aexecute_first_completed_wins(mock_client, sample_state):
+    """Test the fastest capable skill wins and the others are cancelled"""
+    cancelled = []
+
+    class SlowSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            return State(IntermediateOutput(analysis="slow", confidence=0.9))
+
+        async def aexecute(self, state):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(self.name)
+                raise
+
+    class FastSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            return State(IntermediateOutput(analysis="fast", confidence=0.5))
+
+    agent = Agent(skills=[SlowSkill(), FastSkill()], client=mock_client)
+    final_state = asyncio.run(agent.aexecute(sample_state))
+
+    assert final_state.data.analysis == "fast"
+    assert final_state.context["last_skill"] == "FastSkill"
+    assert cancelled == ["SlowSkill"]
+
+
+def test_agent_aexecute_bounds_and_closes_candidates(mock_client, sample_state):
+    """Test at most max_parallel_agents candidates run and cancelled ones get
+    an ERROR closing their SKILL_START"""
+
+    class SlowSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            return State(IntermediateOutput(analysis="slow", confidence=0.9))
+
+        async def aexecute(self, state):
+            running.append(self.name)
+            peak.append(len(running))
+            try:
+                await asyncio.sleep(5)
+            finally:
+                running.remove(self.name)
+
+    class FastSkill(SlowSkill):
+        async def aexecute(self, state):
+            peak.append(len(running) + 1)
+            return State(IntermediateOutput(analysis="fast", confidence=0.5))
+
+    class QueuedSkill(SlowSkill):
+        pass
+
+    running, peak, events = [], [], []
+    agent = Agent(
+        skills=[SlowSkill(), FastSkill(), QueuedSkill()],
+        client=mock_client,
+        max_parallel_agents=2,
+    )
+    for point in (HookPoint.SKILL_START, HookPoint.SKILL_END, HookPoint.ERROR):
+        agent.hooks.on(
+            point,
+            lambda skill, state, point=point, **kwargs: events.append(
+                (point, skill.name, type(kwargs.get("exception")))
+            ),
+        )
+
+    final_state = asyncio.run(agent.aexecute(sample_state, max_steps=1))
+
+    assert final_state.context["last_skill"] == "FastSkill"
+    assert "error" not in final_state.context
+    assert events == [
+        (HookPoint.SKILL_START, "SlowSkill", type(None)),
+        (HookPoint.SKILL_START, "FastSkill", type(None)),
+        # Starts once FastSkill frees its slot, before the race is settled
+        (HookPoint.SKILL_START, "QueuedSkill", type(None)),
+        (HookPoint.ERROR, "SlowSkill", asyncio.CancelledError),
+        (HookPoint.ERROR, "QueuedSkill", asyncio.CancelledError),
+        (HookPoint.SKILL_END, "FastSkill", type(None)),
+    ]
+    assert max(peak) == 2
+
+
+def test_agent_aexecute_error_falls_through(mock_client, sample_state):
+    """Test a failing skill does not prevent another from winning"""
+
+    class ErrorSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[FinalOutput]:
+            raise ValueError("Test error")
+
+    class SlowAnalyzerSkill(AnalyzerSkill):
+        async def aexecute(self, state):
+            await asyncio.sleep(0.1)
+            return await super().aexecute(state)
+
+    agent = Agent(skills=[ErrorSkill(), SlowAnalyzerSkill()], client=mock_client)
+    errors = []
+    agent.hooks.on(HookPoint.ERROR, lambda **kwargs: errors.append(kwargs["skill"]))
+
+    final_state = asyncio.run(agent.aexecute(sample_state, max_steps=1))
+
+    assert isinstance(final_state.data, IntermediateOutput)
+    assert [s.name for s in errors] == ["ErrorSkill"]
+
+
+def test_agent_timestamps_optional(mock_client, sample_state):
+    """Test wall-clock timestamps can be disabled while durations are kept"""
+    agent = Agent(
+        skills=[AnalyzerSkill(), ResponderSkill()],
+        client=mock_client,
+        timestamps=False,
+    )
+    final_state = agent.execute(sample_state)
+
+    assert not any(key.endswith("_at") for key in final_state.context)
+    assert final_state.context["step_duration_ns"] >= 0
+    assert final_state.context["total_steps"] == 2
+
+
+def test_agent_dispatch_memoized_by_type(sample_agent, sample_state):
+    """Test capable skills are computed once per data type"""
+    sample_agent.execute(sample_state)
+
+    assert sample_agent._by_type[QueryInput] == [sample_agent.skills[0]]
+    assert sample_agent._by_type[FinalOutput] == []
+
+    responder = ResponderSkill()
+    sample_agent.skills = [responder]
+    assert sample_agent._by_type == {}
+    assert responder.agent is sample_agent
+
+
+def test_agent_dispatch_custom_can_handle(mock_client, sample_state):
+    """Test skills overriding can_handle are asked on every step"""
+
+    class PickySkill(AnalyzerSkill):
+        def can_handle(self, state):
+            return state.context.get("user_id") == "123"
+
+    agent = Agent(skills=[PickySkill()], client=mock_client)
+    assert agent._by_type is None
+
+    final_state = agent.execute(sample_state.with_context(user_id="456"))
+    assert final_state.context["total_steps"] == 0
+
+
+def test_agent_skill_skip(mock_client, sample_state):
+    """Test SKILL_SKIP declines a state and the next capable skill runs"""
+
+    class DecliningSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            return SKILL_SKIP
+
+    agent = Agent(skills=[DecliningSkill(), AnalyzerSkill()], client=mock_client)
+    final_state = agent.execute(sample_state, max_steps=1)
+
+    assert final_state.context["last_skill"] == "AnalyzerSkill"
+    assert "error" not in final_state.context
+
+
+def test_agent_error_cleared_after_success(mock_client, sample_state):
+    """Test error context from a failed skill is dropped once another succeeds"""
+
+    class ErrorSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            raise ValueError("Test error")
+
+    errors = []
+    agent = Agent(skills=[ErrorSkill(), AnalyzerSkill()], client=mock_client)
+    agent.hooks.on(
+        HookPoint.ERROR, lambda state, **kwargs: errors.append(state.context["error"])
+    )
+    final_state = agent.execute(sample_state, max_steps=1)
+
+    assert errors == ["Test error"]
+    assert final_state.context["last_skill"] == "AnalyzerSkill"
+    assert not {"error", "error_skill", "error_step"} & final_state.context.keys()
+    assert final_state.context["user_id"] == "123"
+
+
+def test_agent_bridges_instructor_hooks(sample_agent, mock_client):
+    """Test instructor completion events are forwarded to agent hooks"""
+    handlers = dict(call.args for call in mock_client.on.call_args_list)
+    requests, errors = [], []
+    sample_agent.hooks.on(
+        HookPoint.LLM_REQUEST, lambda **kwargs: requests.append(kwargs)
+    )
+    sample_agent.hooks.on(HookPoint.ERROR, lambda exception: errors.append(exception))
+
+    error = RuntimeError("rate limited")
+    handlers["completion:kwargs"](model="gpt-4o-mini", messages=[])
+    handlers["completion:error"](error)
+
+    assert requests == [{"model": "gpt-4o-mini", "messages": []}]
+    assert errors == [error]
+
+
+def test_agent_and_skills_use_slots(sample_agent):
+    """Test agents and slotted skill subclasses carry no per-instance __dict__"""
+
+    class SlottedSkill(Skill):
+        __slots__ = ()
+
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            return state.with_data(IntermediateOutput(analysis="a", confidence=0.9))
+
+    assert not hasattr(sample_agent, "__dict__")
+    assert not hasattr(SlottedSkill(), "__dict__")
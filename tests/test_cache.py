@@ -0,0 +1,302 @@
+# tests/test_cache.py
+import pytest
+from unittest.mock import Mock
+from waspnest import Agent
+from waspnest.cache import LLMCache, DictBackend, FileBackend
+from waspnest.core.schema import schema_digest, stable_digest
+from conftest import FinalOutput, IntermediateOutput
+
+
+@pytest.fixture
+def cache():
+    return LLMCache()
+
+
+def test_cache_key_is_deterministic():
+    """Test identical requests map to the same key"""
+    key1 = LLMCache.make_key("prompt", FinalOutput, "system", "gpt-4o-mini")
+    key2 = LLMCache.make_key("prompt", FinalOutput, "system", "gpt-4o-mini")
+
+    assert key1 == key2
+    assert len(key1) == 64
+
+
+def test_cache_key_varies_by_input():
+    """Test every key component changes the key"""
+    base = LLMCache.make_key("prompt", FinalOutput, "system", "gpt-4o-mini")
+
+    assert base != LLMCache.make_key("other", FinalOutput, "system", "gpt-4o-mini")
+    assert base != LLMCache.make_key(
+        "prompt", IntermediateOutput, "system", "gpt-4o-mini"
+    )
+    assert base != LLMCache.make_key("prompt", FinalOutput, None, "gpt-4o-mini")
+    assert base != LLMCache.make_key("prompt", FinalOutput, "system", "gpt-4o")
+
+
+def test_cache_hit_miss_counters(cache):
+    """Test hits and misses are counted"""
+    assert cache.get("key") is None
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_dict_backend_ttl(monkeypatch):
+    """Test expired entries are dropped"""
+    backend = DictBackend()
+    monkeypatch.setattr("waspnest.cache.llm_cache.time.time", lambda: 100.0)
+    backend.set("key", "value", ttl=10)
+    assert backend.get("key") == "value"
+
+    monkeypatch.setattr("waspnest.cache.llm_cache.time.time", lambda: 111.0)
+    assert backend.get("key") is None
+
+
+def test_file_backend_roundtrip(tmp_path):
+    """Test file backend persists across instances"""
+    FileBackend(str(tmp_path)).set("key", "value")
+
+    assert FileBackend(str(tmp_path)).get("key") == "value"
+    assert FileBackend(str(tmp_path)).get("missing") is None
+
+
+def test_ask_uses_cache(analyzer_skill, sample_agent, mock_client):
+    """Test repeated deterministic asks hit the cache"""
+    first = analyzer_skill.ask("test prompt", FinalOutput, system_prompt="system")
+    second = analyzer_skill.ask("test prompt", FinalOutput, system_prompt="system")
+
+    assert first == second
+    assert isinstance(second, FinalOutput)
+    assert mock_client.chat.completions.create.call_count == 1
+    assert sample_agent.llm_cache.hits == 1
+    assert sample_agent.llm_cache.misses == 1
+
+
+def test_ask_skips_cache_with_temperature(analyzer_skill, sample_agent, mock_client):
+    """Test non-deterministic asks bypass the cache"""
+    analyzer_skill.ask("test prompt", FinalOutput, temperature=0.7)
+    analyzer_skill.ask("test prompt", FinalOutput, temperature=0.7)
+
+    assert mock_client.chat.completions.create.call_count == 2
+    assert sample_agent.llm_cache.hits == 0
+
+
+def test_agent_custom_cache(mock_client, analyzer_skill):
+    """Test a cache instance can be shared with the agent"""
+    cache = LLMCache()
+    agent = Agent(skills=[analyzer_skill], client=mock_client, llm_cache=cache)
+
+    assert agent.llm_cache is cache
+
+
+def _bag_of_words(text):
+    """Tiny deterministic embedding for tests"""
+    np = pytest.importorskip("numpy")
+    vocab = ["reset", "password", "mac", "weather", "today"]
+    words = text.lower().replace("?", "").split()
+    return np.array([float(w in words) for w in vocab])
+
+
+@pytest.fixture
+def semantic_cache():
+    pytest.importorskip("numpy")
+    from waspnest.cache import SemanticCache
+
+    return SemanticCache(threshold=0.8, max_entries=2, embed=_bag_of_words)
+
+
+def test_semantic_cache_similar_prompt(semantic_cache):
+    """Test paraphrases above the threshold hit"""
+    semantic_cache.set("scope", "reset password mac", "value")
+
+    assert semantic_cache.get("scope", "How to reset my password on a Mac?") == "value"
+    assert semantic_cache.get("scope", "weather today") is None
+    assert semantic_cache.hits == 1
+    assert semantic_cache.misses == 1
+
+
+def test_semantic_cache_scopes(semantic_cache):
+    """Test entries only match within the same scope"""
+    semantic_cache.set("scope-a", "reset password", "value")
+
+    assert semantic_cache.get("scope-b", "reset password") is None
+
+
+def test_semantic_cache_lru_eviction(semantic_cache):
+    """Test least recently used entries are evicted at capacity"""
+    semantic_cache.set("scope", "reset password", "password")
+    semantic_cache.set("scope", "weather today", "weather")
+    semantic_cache.get("scope", "reset password")
+    semantic_cache.set("scope", "mac", "mac")
+
+    assert len(semantic_cache) == 2
+    assert semantic_cache.get("scope", "reset password") == "password"
+    assert semantic_cache.get("scope", "weather today") is None
+
+
+def test_ask_semantic_policy(analyzer_skill, sample_agent, mock_client, semantic_cache):
+    """Test semantic tier is consulted only under the semantic policy"""
+    sample_agent.semantic_cache = semantic_cache
+    analyzer_skill.ask("reset password mac", FinalOutput)
+
+    analyzer_skill.ask("reset my password on mac", FinalOutput)
+    assert mock_client.chat.completions.create.call_count == 1
+
+    analyzer_skill.ask("password reset on mac", FinalOutput, cache_policy="exact")
+    assert mock_client.chat.completions.create.call_count == 2
+
+    analyzer_skill.ask("reset password mac", FinalOutput, cache_policy="off")
+    assert mock_client.chat.completions.create.call_count == 3
+
+
+def test_ask_invalid_cache_policy(analyzer_skill, sample_agent):
+    """Test unknown cache policies are rejected"""
+    with pytest.raises(ValueError, match="Unknown cache policy"):
+        analyzer_skill.ask("test prompt", FinalOutput, cache_policy="fuzzy")
+
+
+def test_schema_digested_once(monkeypatch):
+    """Test response schemas are generated once per model"""
+    schema_digest.cache_clear()
+    model_json_schema = Mock(wraps=FinalOutput.model_json_schema)
+    monkeypatch.setattr(FinalOutput, "model_json_schema", model_json_schema)
+
+    LLMCache.make_key("a", FinalOutput, None, "gpt-4o-mini")
+    LLMCache.make_key("b", FinalOutput, None, "gpt-4o-mini")
+
+    assert model_json_schema.call_count == 1
+    assert schema_digest(FinalOutput) == stable_digest(FinalOutput.model_json_schema())
+    schema_digest.cache_clear()
+
+
+def test_stable_digest_matches_without_orjson(monkeypatch):
+    """Test the stdlib fallback produces the same keys as orjson"""
+    pytest.importorskip("orjson")
+    payloads = [
+        {"user": "héllo", "system": None, "model": "gpt-4o-mini", "n": [1, 2]},
+        {"temperature": 0.7, "top_p": 1e-5, "scale": 1e20, "tiny": -2.5e-7},
+        {"nan": float("nan"), "inf": float("-inf"), "zero": -0.0},
+        {10: "b", 9: "c", 1.5: "x", True: "t", None: "n", "s": ("tuple",)},
+        {"text": 'quote " slash \\ tab \t control \x01 \u2028', "big": 2**62},
+    ]
+    digests = [stable_digest(payload) for payload in payloads]
+
+    monkeypatch.setattr("waspnest.core.schema.orjson", None)
+    assert [stable_digest(payload) for payload in payloads] == digests
+
+
+def test_semantic_cache_growth_and_float16():
+    """Test the embedding matrix grows by doubling and supports float16"""
+    np = pytest.importorskip("numpy")
+    from waspnest.cache import SemanticCache
+
+    cache = SemanticCache(
+        threshold=0.99,
+        max_entries=40,
+        embed=lambda text: np.eye(40)[int(text)],
+        dtype="float16",
+    )
+    for i in range(20):
+        cache.set("scope", str(i), f"value {i}")
+
+    assert cache.E.shape == (32, 40)
+    assert cache.E.dtype == np.float16
+    assert np.allclose(
+        np.linalg.norm(cache.E[:20].astype(np.float32), axis=1), 1.0, atol=1e-3
+    )
+    assert all(cache.get("scope", str(i)) == f"value {i}" for i in range(20))
+
+
+def test_cache_key_includes_kwargs():
+    """Test extra request arguments are part of the key"""
+    base = LLMCache.make_key("prompt", FinalOutput, None, "gpt-4o-mini")
+
+    assert base == LLMCache.make_key("prompt", FinalOutput, None, "gpt-4o-mini", {})
+    assert base != LLMCache.make_key(
+        "prompt", FinalOutput, None, "gpt-4o-mini", {"max_tokens": 10}
+    )
+
+
+def test_dict_backend_lru_eviction():
+    """Test the dict backend evicts least recently used entries"""
+    backend = DictBackend(max_size=2)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a")
+    backend.set("c", "3")
+
+    assert len(backend) == 2
+    assert backend.get("a") == "1"
+    assert backend.get("b") is None
+
+
+def test_ask_unserializable_kwargs_bypass_cache(
+    analyzer_skill, sample_agent, mock_client
+):
+    """Test requests with unserializable arguments are not cached"""
+    analyzer_skill.ask("test prompt", FinalOutput, validation_context=object())
+    analyzer_skill.ask("test prompt", FinalOutput, validation_context=object())
+
+    assert mock_client.chat.completions.create.call_count == 2
+
+
+def test_agent_cache_stats(analyzer_skill, sample_agent):
+    """Test cache statistics are reported per cache"""
+    analyzer_skill.ask("test prompt", FinalOutput)
+    analyzer_skill.ask("test prompt", FinalOutput)
+
+    assert sample_agent.cache_stats() == {
+        "exact": {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    }
+
+
+def test_caches_are_thread_safe():
+    """Test concurrent writers neither corrupt nor lose cache entries"""
+    np = pytest.importorskip("numpy")
+    import sys
+    import threading
+    from waspnest.cache import SemanticCache
+
+    def hammer(semantic, backend, workers=8, n=1000):
+        start = threading.Barrier(workers)
+        errors = []
+
+        def write(worker):
+            start.wait()
+            try:
+                for i in range(n):
+                    semantic.set(f"scope-{worker}", f"prompt {i}", f"value {i}")
+                    backend.set(f"{worker}-{i}", "value")
+                    backend.get(f"{worker}-{i - 1}")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often enough to hit races
+    try:
+        # The race is timing dependent, so give it several chances to show up
+        for _ in range(5):
+            semantic = SemanticCache(
+                threshold=0.99,
+                max_entries=20_000,
+                embed=lambda text: np.random.rand(512),
+            )
+            backend = DictBackend(max_size=100)
+
+            assert hammer(semantic, backend) == []
+            assert len(semantic) == 8000
+            assert sorted(semantic._values) == sorted(
+                [f"value {i}" for i in range(1000)] * 8
+            )
+            assert len(backend) == 100
+    finally:
+        sys.setswitchinterval(interval)
@@ -0,0 +1,82 @@
+# tests/test_examples.py
+import asyncio
+import importlib.util
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock
+import pytest
+from waspnest import Agent, State
+
+
+def _load_example(name):
+    path = Path(__file__).parent.parent / "examples" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(f"examples_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+complex_hook = _load_example("complex_hook")
+
+
+def _respond(response_model, **kwargs):
+    if response_model is complex_hook.DetailedResponse:
+        return complex_hook.DetailedResponse(
+            answer="detailed", explanation="why", confidence=0.9, references=[]
+        )
+    return complex_hook.SimpleResponse(answer="simple", confidence=0.9)
+
+
+@pytest.fixture
+def smart_skill():
+    return complex_hook.SmartAnswerSkill()
+
+
+@pytest.mark.parametrize(
+    "text, complexity, borderline",
+    [
+        ("What time is it in New York?", 0.5, False),
+        ("How do I reset my password?", 0.5, True),
+        ("Can you explain how quantum computers work and their impact?", 0.8, False),
+    ],
+)
+def test_complexity_routing(smart_skill, text, complexity, borderline):
+    """Test routing is unchanged and only short complex queries are borderline"""
+    assert smart_skill.analyze_complexity(text) == complexity
+    assert smart_skill.is_borderline(text) is borderline
+
+
+def test_speculation_requires_async_client(mock_client, smart_skill):
+    """Test borderline queries make one request without an async client"""
+    mock_client.chat.completions.create.side_effect = _respond
+    Agent(skills=[smart_skill], client=mock_client, speculative=True)
+
+    borderline = State(complex_hook.Query(text="How do I reset it?"))
+    state = asyncio.run(smart_skill.aexecute(borderline))
+
+    assert isinstance(state.data, complex_hook.SimpleResponse)
+    assert mock_client.chat.completions.create.call_count == 1
+
+
+def test_speculation_with_async_client(mock_client, smart_skill):
+    """Test borderline queries race both requests when run async only"""
+    async_client = Mock()
+    async_client.chat.completions.create = AsyncMock(side_effect=_respond)
+    mock_client.chat.completions.create.side_effect = _respond
+    Agent(
+        skills=[smart_skill],
+        client=mock_client,
+        async_client=async_client,
+        speculative=True,
+    )
+
+    borderline = State(complex_hook.Query(text="How do I reset my password?"))
+    assert asyncio.run(smart_skill.aexecute(borderline)).data.answer == "simple"
+    assert async_client.chat.completions.create.await_count == 2
+
+    # Sync execution and non-borderline queries never speculate
+    sync = State(complex_hook.Query(text="Why is the sky blue?"))
+    assert smart_skill.execute(sync).data.answer == "simple"
+    simple = State(complex_hook.Query(text="What time is it in New York?"))
+    assert asyncio.run(smart_skill.aexecute(simple)).data.answer == "simple"
+    assert async_client.chat.completions.create.await_count == 2
+    assert mock_client.chat.completions.create.call_count == 2
@@ -1,5 +1,5 @@
 # tests/test_hooks.py
-from waspnest.hooks import Hooks, HookPoint
+from waspnest.hooks import Hooks, HookPoint, _noop
 import pytest
 from unittest.mock import Mock
 
@@ -77,3 +77,76 @@ def test_hook_execution_order(hooks):
 
     hooks.trigger(HookPoint.PRE_EXECUTE)
     assert call_order == [1, 2]
+
+
+def test_trigger_without_hooks(hooks):
+    """Test triggering a hook point with no callbacks is a no-op"""
+    hooks.trigger(HookPoint.SKILL_START, state="test")
+
+    assert hooks.hooks[HookPoint.SKILL_START] == ()
+    assert not hooks.has(HookPoint.SKILL_START)
+
+
+def test_hook_errors_batched(hooks):
+    """Test failures in several hooks produce a single ERROR trigger"""
+
+    def error_hook(**kwargs):
+        raise ValueError("Hook error")
+
+    error_callback = Mock()
+    hooks.on(HookPoint.SKILL_END, error_hook)
+    hooks.on(HookPoint.SKILL_END, error_hook)
+    hooks.on(HookPoint.ERROR, error_callback)
+
+    hooks.trigger(HookPoint.SKILL_END, state="test")
+
+    error_callback.assert_called_once()
+    kwargs = error_callback.call_args.kwargs
+    assert kwargs["hook"] is error_hook
+    assert str(kwargs["exception"]) == "Hook error"
+    assert [hook for hook, _ in kwargs["errors"]] == [error_hook, error_hook]
+
+
+def test_error_hook_failure_not_recursive(hooks):
+    """Test a failing ERROR hook does not re-trigger ERROR"""
+    calls = []
+
+    def failing_error_hook(**kwargs):
+        calls.append(kwargs)
+        raise ValueError("Error hook error")
+
+    hooks.on(HookPoint.ERROR, failing_error_hook)
+    hooks.trigger(HookPoint.ERROR, exception=ValueError("original"))
+
+    assert len(calls) == 1
+
+
+def test_hook_points_without_callbacks_are_noops(hooks):
+    """Test only hook points with callbacks get a dispatch function"""
+    hooks.on(HookPoint.SKILL_END, Mock())
+
+    assert hooks._compiled[HookPoint.SKILL_START] is _noop
+    assert hooks._compiled[HookPoint.SKILL_END] is not _noop
+
+
+def test_hook_registered_during_trigger_runs_next_time(hooks):
+    """Test callbacks are dispatched from a snapshot taken at registration"""
+    late = Mock()
+    hooks.on(HookPoint.SKILL_END, lambda: hooks.on(HookPoint.SKILL_END, late))
+
+    hooks.trigger(HookPoint.SKILL_END)
+    late.assert_not_called()
+
+    hooks.trigger(HookPoint.SKILL_END)
+    late.assert_called_once_with()
+
+
+def test_hook_registry_is_read_only(hooks):
+    """Test callbacks can only be registered through on()"""
+    callback = Mock()
+    hooks.on(HookPoint.SKILL_START, callback)
+
+    assert hooks.hooks[HookPoint.SKILL_START] == (callback,)
+    assert hooks.has(HookPoint.SKILL_START)
+    with pytest.raises(AttributeError):
+        hooks.hooks[HookPoint.SKILL_START].append(Mock())
@@ -1,6 +1,10 @@
 # tests/test_skill.py
+import asyncio
 import pytest
-from waspnest import State, skill
+from unittest.mock import AsyncMock, Mock
+from pydantic import BaseModel
+from waspnest import Agent, State, Skill, skill
+from waspnest.hooks import HookPoint
 
 from conftest import QueryInput, IntermediateOutput, FinalOutput, AnalyzerSkill
 
@@ -79,3 +83,303 @@ def test_skill_context_preservation(analyzer_skill, sample_state):
     """Test context preservation through execution"""
     output_state = analyzer_skill.execute(sample_state)
     assert output_state.context == sample_state.context
+
+
+def test_skill_ask_batch(analyzer_skill, sample_agent, mock_client):
+    """Test ask_batch sends one request and scatters the responses"""
+    mock_client.chat.completions.create.return_value = None
+    mock_client.chat.completions.create.side_effect = lambda **kwargs: kwargs[
+        "response_model"
+    ](items=[FinalOutput(response=f"r{i}", confidence=0.5) for i in range(3)])
+
+    results = analyzer_skill.ask_batch(["a", "b", "c"], FinalOutput)
+
+    assert [r.response for r in results] == ["r0", "r1", "r2"]
+    assert mock_client.chat.completions.create.call_count == 1
+    prompt = mock_client.chat.completions.create.call_args.kwargs["messages"][-1]
+    assert prompt["content"] == "1. a\n\n2. b\n\n3. c"
+
+
+def test_skill_ask_batch_length_mismatch(analyzer_skill, sample_agent, mock_client):
+    """Test ask_batch rejects a response count that does not match"""
+    mock_client.chat.completions.create.side_effect = lambda **kwargs: kwargs[
+        "response_model"
+    ](items=[FinalOutput(response="only one", confidence=0.5)])
+
+    with pytest.raises(ValueError, match="Expected 2 batched responses"):
+        analyzer_skill.ask_batch(["a", "b"], FinalOutput)
+
+
+class PartialFinalOutput(BaseModel):
+    """Stand-in for instructor's Partial[FinalOutput]"""
+
+    response: str | None = None
+    confidence: float | None = None
+
+
+def test_skill_ask_streaming(analyzer_skill, sample_agent, mock_client):
+    """Test streamed responses emit batched deltas through hooks and on_token"""
+    mock_client.chat.completions.create_partial.return_value = iter(
+        [
+            PartialFinalOutput(),
+            PartialFinalOutput(response="Hel"),
+            PartialFinalOutput(response="Hello"),
+            PartialFinalOutput(response="Hello world", confidence=0.7),
+        ]
+    )
+    hook_deltas = []
+    sample_agent.hooks.on(
+        HookPoint.LLM_TOKEN, lambda skill, delta: hook_deltas.append(delta)
+    )
+    token_deltas = []
+
+    result = analyzer_skill.ask(
+        "test prompt", FinalOutput, on_token=token_deltas.append
+    )
+
+    assert result == FinalOutput(response="Hello world", confidence=0.7)
+    assert hook_deltas == token_deltas
+    assert "".join(hook_deltas) == '{"response":"Hello world","confidence":0.7'
+    mock_client.chat.completions.create.assert_not_called()
+
+
+def test_skill_aask_without_async_client(analyzer_skill, sample_agent, mock_client):
+    """Test aask falls back to the sync client in a worker thread"""
+    result = asyncio.run(analyzer_skill.aask("test prompt", FinalOutput))
+
+    assert result == FinalOutput(response="test response", confidence=0.8)
+    mock_client.chat.completions.create.assert_called_once()
+
+
+def test_skill_aask_with_async_client(mock_client, analyzer_skill):
+    """Test aask awaits the async client and shares the response cache"""
+    async_client = Mock()
+    async_client.chat.completions.create = AsyncMock(
+        return_value=FinalOutput(response="async response", confidence=0.6)
+    )
+    Agent(skills=[analyzer_skill], client=mock_client, async_client=async_client)
+
+    first = asyncio.run(analyzer_skill.aask("test prompt", FinalOutput))
+    second = analyzer_skill.ask("test prompt", FinalOutput)
+
+    assert first == second == FinalOutput(response="async response", confidence=0.6)
+    async_client.chat.completions.create.assert_awaited_once()
+    mock_client.chat.completions.create.assert_not_called()
+
+
+def test_skill_decorator_resolves_types_once(monkeypatch, analyzer_skill, sample_state):
+    """Test annotations are resolved at decoration time, not per call"""
+
+    def fail(*args, **kwargs):
+        raise AssertionError("get_type_hints called during execution")
+
+    monkeypatch.setattr("waspnest.core.skill.get_type_hints", fail)
+    analyzer_skill.execute(sample_state)
+    assert analyzer_skill.can_handle(sample_state)
+
+
+def test_skill_decorator_union_output():
+    """Test A | B return annotations validate against either type"""
+
+    @skill
+    def execute_func(
+        self, state: State[QueryInput]
+    ) -> State[IntermediateOutput | FinalOutput]:
+        return State(QueryInput(text="wrong"))
+
+    assert execute_func.output_types == (IntermediateOutput, FinalOutput)
+    with pytest.raises(
+        TypeError, match="Output must be one of: IntermediateOutput, FinalOutput"
+    ):
+        execute_func(None, State(QueryInput(text="test")))
+
+
+def test_skill_decorator_requires_state_return():
+    """Test a non-State return annotation is rejected when decorating"""
+    with pytest.raises(TypeError, match="Return type must be State"):
+
+        @skill
+        def execute_func(self, state: State[QueryInput]) -> IntermediateOutput:
+            return IntermediateOutput(analysis="test", confidence=0.9)
+
+
+def test_skill_ask_many(mock_client, analyzer_skill):
+    """Test ask_many issues one request per prompt, bounded and in order"""
+    in_flight = []
+    peak = []
+
+    async def create(**kwargs):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        prompt = kwargs["messages"][-1]["content"]
+        return FinalOutput(response=f"answer to {prompt}", confidence=0.9)
+
+    async_client = Mock()
+    async_client.chat.completions.create = create
+    Agent(skills=[analyzer_skill], client=mock_client, async_client=async_client)
+
+    results = analyzer_skill.ask_many(
+        [f"q{i}" for i in range(6)], FinalOutput, max_concurrency=2
+    )
+
+    assert [r.response for r in results] == [f"answer to q{i}" for i in range(6)]
+    assert max(peak) == 2
+
+
+def test_skill_types_cached_on_class(analyzer_skill):
+    """Test declared types are cached on the skill class"""
+    assert AnalyzerSkill.input_type is QueryInput
+    assert AnalyzerSkill.output_types == (IntermediateOutput,)
+    assert analyzer_skill.input_type is QueryInput
+
+
+def test_skill_can_handle_subclass(analyzer_skill):
+    """Test subclasses of the input type are still accepted"""
+
+    class DetailedQuery(QueryInput):
+        detail: str
+
+    assert analyzer_skill.can_handle(State(DetailedQuery(text="a", detail="b")))
+
+
+def test_skill_decorator_accepts_subclasses():
+    """Test the exact-type fast path still accepts subclasses"""
+
+    class DetailedQuery(QueryInput):
+        detail: str
+
+    class DetailedOutput(IntermediateOutput):
+        pass
+
+    @skill
+    def execute_func(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+        return State(DetailedOutput(analysis=state.data.text, confidence=0.9))
+
+    result = execute_func(None, State(DetailedQuery(text="a", detail="b")))
+    assert isinstance(result.data, DetailedOutput)
+
+    with pytest.raises(TypeError, match="Expected input type"):
+        execute_func(None, State(FinalOutput(response="a", confidence=0.9)))
+
+
+def test_skill_decorator_requires_pydantic_types():
+    """Test non-Pydantic state types are rejected when decorating"""
+    with pytest.raises(TypeError, match="State types must be Pydantic models"):
+
+        @skill
+        def execute_func(self, state: State[dict]) -> State[IntermediateOutput]:
+            return State(IntermediateOutput(analysis="test", confidence=0.9))
+
+
+def test_skill_ask_stream(analyzer_skill, sample_agent, mock_client):
+    """Test ask_stream yields partial responses as they arrive"""
+    partials = [PartialFinalOutput(), PartialFinalOutput(response="Hi")]
+    mock_client.chat.completions.create_partial.return_value = iter(partials)
+
+    assert list(analyzer_skill.ask_stream("test prompt", FinalOutput)) == partials
+    kwargs = mock_client.chat.completions.create_partial.call_args.kwargs
+    assert kwargs["messages"] == [{"role": "user", "content": "test prompt"}]
+
+
+def test_generator_skill_progress(mock_client, sample_state):
+    """Test generator skills fire SKILL_PROGRESS and return their last state"""
+
+    class DraftSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[FinalOutput]:
+            yield state.with_data(PartialFinalOutput(response="Hel"))
+            yield state.with_data(FinalOutput(response="Hello", confidence=0.9))
+
+    agent = Agent(skills=[DraftSkill()], client=mock_client)
+    progress = []
+    agent.hooks.on(
+        HookPoint.SKILL_PROGRESS, lambda skill, state: progress.append(state.data)
+    )
+
+    final_state = agent.execute(sample_state)
+
+    assert final_state.data == FinalOutput(response="Hello", confidence=0.9)
+    assert progress == [
+        PartialFinalOutput(response="Hel"),
+        FinalOutput(response="Hello", confidence=0.9),
+    ]
+
+
+def test_generator_skill_validates_last_state():
+    """Test only the final yielded state must match the return annotation"""
+
+    @skill
+    def execute_func(self, state: State[QueryInput]) -> State[FinalOutput]:
+        yield State(PartialFinalOutput(response="Hel"))
+
+    with pytest.raises(TypeError, match="Output must be FinalOutput"):
+        list(execute_func(None, State(QueryInput(text="test"))))
+
+
+def test_cacheable_skill_memoizes_execute(sample_state):
+    """Test cacheable skills run once per distinct input data"""
+    calls = []
+
+    class CountingSkill(Skill, cacheable=True):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            calls.append(state.data.text)
+            return state.with_data(IntermediateOutput(analysis="a", confidence=0.9))
+
+    counting = CountingSkill()
+    first = counting.execute(sample_state)
+    second = counting.execute(sample_state.with_context(retry=True))
+    counting.execute(State(QueryInput(text="other")))
+
+    assert calls == ["test query", "other"]
+    assert second.data == first.data
+    assert second.data is not first.data
+    assert second.context["retry"] is True
+    assert CountingSkill.input_type is QueryInput
+    assert CountingSkill().can_handle(sample_state)
+    assert not AnalyzerSkill.cacheable
+
+
+def test_cacheable_skill_rejects_generators():
+    """Test generator skills cannot opt into memoization"""
+    with pytest.raises(TypeError, match="cannot be cacheable"):
+
+        class StreamingSkill(Skill, cacheable=True):
+            @skill
+            def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+                yield State(IntermediateOutput(analysis="a", confidence=0.9))
+
+
+def test_skill_can_handle_does_not_introspect_execute(sample_state):
+    """Test can_handle uses the type resolved at class creation"""
+
+    class LateSkill(Skill):
+        @skill
+        def execute(self, state: State[QueryInput]) -> State[IntermediateOutput]:
+            return state.with_data(IntermediateOutput(analysis="a", confidence=0.9))
+
+    del LateSkill.execute.input_type
+    late = LateSkill()
+
+    assert late.input_type is QueryInput
+    assert late.can_handle(sample_state)
+    assert not late.can_handle(State(FinalOutput(response="a", confidence=0.9)))
+
+
+def test_skill_aask_many_inside_event_loop(mock_client, analyzer_skill):
+    """Test aask_many can be awaited from code already running a loop"""
+    async_client = Mock()
+    async_client.chat.completions.create = AsyncMock(
+        side_effect=lambda **kwargs: FinalOutput(
+            response=kwargs["messages"][-1]["content"], confidence=0.9
+        )
+    )
+    Agent(skills=[analyzer_skill], client=mock_client, async_client=async_client)
+
+    async def run():
+        return await analyzer_skill.aask_many(["a", "b"], FinalOutput)
+
+    results = asyncio.run(run())
+    assert [r.response for r in results] == ["a", "b"]
@@ -1,7 +1,7 @@
 # tests/test_state.py
 import pytest
 from dataclasses import FrozenInstanceError
-from waspnest.core.state import State
+from waspnest.core.state import Context, State
 from conftest import QueryInput
 
 
@@ -39,3 +39,99 @@ def test_state_none_values():
     state = State(QueryInput(text="test"))
     assert state.metadata == {}
     assert state.context == {}
+
+
+def test_state_with_data(sample_state):
+    """Test data replacement keeps context and metadata"""
+    new_data = QueryInput(text="other")
+    new_state = sample_state.with_data(new_data)
+
+    assert new_state.data is new_data
+    assert new_state.context == {"user_id": "123"}
+    assert new_state.metadata == {"source": "test"}
+    assert sample_state.data.text == "test query"
+
+
+def test_state_uses_slots(sample_state):
+    """Test states carry no per-instance __dict__"""
+    assert not hasattr(sample_state, "__dict__")
+
+
+def test_state_current_step(sample_state):
+    """Test current_step defaults and is carried through updates"""
+    assert sample_state.current_step == "initial"
+
+    stepped = sample_state.at_step(2, current_skill="AnalyzerSkill")
+    assert stepped.current_step == 2
+    assert stepped.context["current_skill"] == "AnalyzerSkill"
+    assert stepped.with_context(extra=True).current_step == 2
+    assert stepped.with_data(QueryInput(text="other")).current_step == 2
+
+
+def test_state_context_shares_structure(sample_state):
+    """Test context updates layer over the previous context instead of copying"""
+    first = sample_state.with_context(session_id="abc")
+    second = first.with_context(step=1)
+
+    assert second.context.maps[1:] == first.context.maps
+    assert second.context.maps[1] is first.context.maps[0]
+    assert second.context == {"user_id": "123", "session_id": "abc", "step": 1}
+    assert repr(second.context) == repr(dict(second.context))
+    assert first.context == {"user_id": "123", "session_id": "abc"}
+
+
+def test_state_context_depth_is_bounded(sample_state):
+    """Test long update chains are flattened to keep lookups short"""
+    state = sample_state
+    for i in range(50):
+        state = state.with_context(**{f"k{i}": i})
+
+    assert len(state.context.maps) <= Context.MAX_DEPTH
+    assert state.context["user_id"] == "123"
+    assert state.context["k49"] == 49
+    assert len(state.context) == 51
+
+
+def test_state_default_mappings_are_read_only():
+    """Test omitted metadata and context share one read-only empty mapping"""
+    first = State(QueryInput(text="a"))
+    second = State(QueryInput(text="b"))
+
+    assert first.context is second.context
+    assert first.metadata is second.metadata
+    with pytest.raises(TypeError):
+        first.context["key"] = "value"
+    assert first.with_context(key="value").context == {"key": "value"}
+    assert second.context == {}
+
+
+def test_state_with_context_shares_metadata(sample_state):
+    """Test context updates reuse the metadata mapping instead of copying it"""
+    assert sample_state.with_context(step=1).metadata is sample_state.metadata
+
+
+def test_state_without_context(sample_state):
+    """Test context keys can be removed without touching the original"""
+    state = sample_state.with_context(error="boom", step=1)
+    cleared = state.without_context("error", "missing")
+
+    assert cleared.context == {"user_id": "123", "step": 1}
+    assert state.context["error"] == "boom"
+
+
+def test_state_context_detached_from_caller_dict():
+    """Test mutating the dict passed in doesn't leak into derived states"""
+    context = {"user_id": "123"}
+    state = State(QueryInput(text="test"), context=context).with_context(step=1)
+    context["user_id"] = "changed"
+
+    assert state.context == {"user_id": "123", "step": 1}
+
+
+def test_state_explicit_none_is_empty():
+    """Test None metadata and context are treated as empty"""
+    state = State(QueryInput(text="test"), metadata=None, context=None)
+
+    assert state.metadata == {}
+    assert state.context == {}
+    assert state.with_context(step=1).context == {"step": 1}
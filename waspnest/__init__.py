@@ -1,6 +1,6 @@
 # __init__.py
 from .core.state import State
-from .core.skill import Skill, skill
+from .core.skill import SKILL_SKIP, Skill, skill
 from .core.agent import Agent
 
-__all__ = ["State", "Skill", "Agent", "skill"]
+__all__ = ["State", "Skill", "Agent", "skill", "SKILL_SKIP"]
@@ -0,0 +1,5 @@
+# waspnest/cache/__init__.py
+from .llm_cache import LLMCache, DictBackend, FileBackend, RedisBackend
+from .semantic_cache import SemanticCache
+
+__all__ = ["LLMCache", "SemanticCache", "DictBackend", "FileBackend", "RedisBackend"]
@@ -0,0 +1,151 @@
+# waspnest/cache/llm_cache.py
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Protocol, Type
+from pydantic import BaseModel
+from ..core.schema import schema_digest, stable_digest
+
+
+class CacheBackend(Protocol):
+    """Storage interface for cached LLM responses (serialized JSON strings)."""
+
+    def get(self, key: str) -> str | None: ...
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None: ...
+
+
+class DictBackend:
+    """In-process dictionary backend (default), evicting least recently used
+    entries beyond `max_size`. Safe to share between threads."""
+
+    def __init__(self, max_size: int | None = 1024):
+        self.max_size = max_size
+        self._data: OrderedDict[str, tuple[str, float | None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            if self.max_size is not None and len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class FileBackend:
+    """Stores one JSON file per key in a directory, shared across processes."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> str | None:
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        expires_at = entry.get("expires_at")
+        if expires_at is not None and expires_at < time.time():
+            return None
+        return entry["value"]
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        expires_at = time.time() + ttl if ttl is not None else None
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"value": value, "expires_at": expires_at}, f)
+        os.replace(tmp_path, self._path(key))
+
+
+class RedisBackend:
+    """Redis backend. Requires the optional `redis` package."""
+
+    def __init__(
+        self, url: str = "redis://localhost:6379/0", prefix: str = "waspnest:"
+    ):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "RedisBackend requires the 'redis' package: pip install redis"
+            ) from e
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> str | None:
+        value = self.client.get(self.prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        self.client.set(self.prefix + key, value, ex=int(ttl) if ttl else None)
+
+
+class LLMCache:
+    """Exact-match cache for structured LLM responses.
+
+    Keys are a SHA-256 over the system prompt, user prompt, model name,
+    response schema and extra request arguments, so any change to one of
+    them is a miss.
+    """
+
+    def __init__(self, backend: CacheBackend | None = None, ttl: float | None = None):
+        self.backend = backend or DictBackend()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        prompt: str,
+        response_model: Type[BaseModel],
+        system_prompt: str | None,
+        model: str,
+        kwargs: dict | None = None,
+    ) -> str:
+        """Build the cache key for a request.
+
+        Raises TypeError if `kwargs` is not JSON-serializable.
+        """
+        payload = {
+            "system": system_prompt,
+            "user": prompt,
+            "model": model,
+            "schema": schema_digest(response_model),
+            "kwargs": kwargs or {},
+        }
+        return stable_digest(payload)
+
+    def get(self, key: str) -> str | None:
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: str, ttl: float | None = None) -> None:
+        self.backend.set(key, value, ttl if ttl is not None else self.ttl)
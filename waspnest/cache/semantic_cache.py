@@ -0,0 +1,156 @@
+# waspnest/cache/semantic_cache.py
+import threading
+from typing import TYPE_CHECKING, Callable, Type
+from pydantic import BaseModel
+from ..core.schema import schema_digest, stable_digest
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class SemanticCache:
+    """Embedding-similarity cache for structured LLM responses.
+
+    Prompts are embedded and compared (cosine similarity) against previously
+    answered prompts with the same system prompt, model and response schema.
+    A stored response is returned when the best match reaches `threshold`.
+
+    Embeddings are L2-normalized on insert and kept in one contiguous matrix,
+    so a lookup is a single matrix-vector product. `dtype="float16"` halves
+    memory, but NumPy has no BLAS path for half precision and the product is
+    slower; float32 is the default.
+
+    Requires `numpy`, plus `sentence-transformers` unless a custom `embed`
+    callable is supplied. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        max_entries: int = 1000,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        embed: Callable[[str], "np.ndarray"] | None = None,
+        dtype: str = "float32",
+    ):
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError(
+                "SemanticCache requires the 'numpy' package: pip install numpy"
+            ) from e
+
+        self._np = np
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.model_name = model_name
+        self._embed = embed
+        self._model = None
+
+        self.dtype = np.dtype(dtype)
+
+        # Row-normalized embeddings; capacity doubles up to max_entries
+        self.E = None
+        self._scope_ids = np.empty(0, dtype=np.int64)
+        self._last_used = np.empty(0, dtype=np.int64)
+        self._scopes: dict[str, int] = {}
+        self._values: list[str] = []
+        self._size = 0
+        self._clock = 0
+
+        self.hits = 0
+        self.misses = 0
+        # Guards the matrix, its bookkeeping arrays and the counters
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def scope_key(
+        response_model: Type[BaseModel],
+        system_prompt: str | None,
+        model: str,
+        kwargs: dict | None = None,
+    ) -> str:
+        """Key for everything except the prompt; only same-scope entries match"""
+        payload = {
+            "system": system_prompt,
+            "model": model,
+            "schema": schema_digest(response_model),
+            "kwargs": kwargs or {},
+        }
+        return stable_digest(payload)
+
+    def embed(self, text: str) -> "np.ndarray":
+        """Embed text as a float32 vector"""
+        if self._embed is None:
+            try:
+                from sentence_transformers import SentenceTransformer
+            except ImportError as e:
+                raise ImportError(
+                    "SemanticCache requires the 'sentence-transformers' package "
+                    "or a custom embed callable"
+                ) from e
+            self._model = SentenceTransformer(self.model_name)
+            self._embed = self._model.encode
+        return self._np.asarray(self._embed(text), dtype=self._np.float32)
+
+    def _normalized(self, text: str) -> "np.ndarray":
+        e = self.embed(text)
+        return (e / (self._np.linalg.norm(e) + 1e-12)).astype(self.dtype)
+
+    def _grow(self, dim: int) -> None:
+        np = self._np
+        capacity = min(max(16, 2 * len(self._values)), self.max_entries)
+        E = np.zeros((capacity, dim), dtype=self.dtype)
+        scope_ids = np.full(capacity, -1, dtype=np.int64)
+        last_used = np.zeros(capacity, dtype=np.int64)
+        if self.E is not None:
+            E[: self._size] = self.E[: self._size]
+            scope_ids[: self._size] = self._scope_ids[: self._size]
+            last_used[: self._size] = self._last_used[: self._size]
+        self.E, self._scope_ids, self._last_used = E, scope_ids, last_used
+
+    def get(self, scope: str, prompt: str) -> str | None:
+        np = self._np
+        # Embed outside the lock; only the matrix lookup is serialized
+        e = self._normalized(prompt) if scope in self._scopes else None
+        with self._lock:
+            scope_id = self._scopes.get(scope)
+            if e is None or scope_id is None or self._size == 0:
+                self.misses += 1
+                return None
+
+            sims = self.E[: self._size] @ e
+            sims = np.where(self._scope_ids[: self._size] == scope_id, sims, -np.inf)
+            i = int(sims.argmax())
+            if sims[i] < self.threshold:
+                self.misses += 1
+                return None
+
+            self._clock += 1
+            self._last_used[i] = self._clock
+            self.hits += 1
+            return self._values[i]
+
+    def set(self, scope: str, prompt: str, value: str) -> None:
+        e = self._normalized(prompt)
+        with self._lock:
+            self._insert(scope, e, value)
+
+    def _insert(self, scope: str, e: "np.ndarray", value: str) -> None:
+        if self._size < self.max_entries:
+            if self.E is None or self._size == self.E.shape[0]:
+                self._grow(e.shape[0])
+            i = self._size
+            self._size += 1
+            self._values.append(value)
+        else:
+            # Evict the least recently used row
+            i = int(self._last_used.argmin())
+            self._values[i] = value
+
+        self._clock += 1
+        self.E[i] = e
+        self._scope_ids[i] = self._scopes.setdefault(scope, len(self._scopes))
+        self._last_used[i] = self._clock
+
+    def __len__(self) -> int:
+        return self._size
@@ -1,86 +1,257 @@
 # waspnet/core/agent.py
+import asyncio
+import time
 from datetime import datetime
-from .skill import Skill
+from functools import partial
+from .skill import SKILL_SKIP, Skill
 from .state import State
 from ..hooks import Hooks, HookPoint
+from ..cache import LLMCache, SemanticCache
+
+# Context added when a skill raises; cleared once a later skill succeeds
+_ERROR_KEYS = ("error", "error_skill", "error_step")
+
+
+def _clear_error(state: State) -> State:
+    """Drop error context left by an earlier failed skill"""
+    if "error" not in state.context:
+        return state
+    return state.without_context(*_ERROR_KEYS)
+
+
+def _run_or_error(skill: Skill, state: State) -> State | Exception:
+    """Run one state through a skill, returning the exception if it raises"""
+    try:
+        return skill._run(state)
+    except Exception as e:
+        return e
 
 
 class Agent:
-    """Coordinates skills and handles execution"""
+    """Coordinates skills and handles execution.
 
-    def __init__(self, skills: list[Skill], client: any, model: str = "gpt-4o-mini"):
+    Skills are matched against the state's data type; the match is memoized
+    per type. Assign a new list to `skills` rather than mutating it in place.
+    """
+
+    __slots__ = (
+        "_skills",
+        "_by_type",
+        "client",
+        "model",
+        "hooks",
+        "llm_cache",
+        "semantic_cache",
+        "max_parallel_agents",
+        "async_client",
+        "speculative",
+        "timestamps",
+    )
+
+    def __init__(
+        self,
+        skills: list[Skill],
+        client: any,
+        model: str = "gpt-4o-mini",
+        llm_cache: LLMCache | None = None,
+        semantic_cache: SemanticCache | None = None,
+        max_parallel_agents: int = 3,
+        async_client: any = None,
+        speculative: bool = False,
+        timestamps: bool = True,
+    ):
         self.skills = skills
         self.client = client
         self.model = model
         self.hooks = Hooks()
+        self.llm_cache = llm_cache if llm_cache is not None else LLMCache()
+        self.semantic_cache = semantic_cache
+        self.max_parallel_agents = max_parallel_agents
+        self.async_client = async_client
+        # Allow skills to issue speculative LLM calls (may increase token spend)
+        self.speculative = speculative
+        # Add ISO-8601 wall-clock timestamps to the context
+        self.timestamps = timestamps
 
         # Bridge to instructor hooks
-        self.client.on(
-            "completion:kwargs",
-            lambda **kwargs: self.hooks.trigger(HookPoint.LLM_REQUEST, **kwargs),
-        )
-        self.client.on(
-            "completion:error",
-            lambda e: self.hooks.trigger(HookPoint.ERROR, exception=e),
-        )
+        for llm_client in (client, async_client):
+            if llm_client is None:
+                continue
+            llm_client.on(
+                "completion:kwargs", partial(self.hooks.trigger, HookPoint.LLM_REQUEST)
+            )
+            llm_client.on("completion:error", self._on_completion_error)
+
+    @property
+    def skills(self) -> list[Skill]:
+        return self._skills
 
+    @skills.setter
+    def skills(self, skills: list[Skill]):
+        self._skills = skills
         # Attach agent to skills
         for skill in skills:
             skill.agent = self
+        # Data type -> capable skills in order. Only valid while every skill
+        # uses the type-based default can_handle; None means scan every time.
+        self._by_type: dict[type, list[Skill]] | None = (
+            {} if all(type(s).can_handle is Skill.can_handle for s in skills) else None
+        )
+
+    def _candidates(self, state: State) -> list[Skill]:
+        """Skills that can handle the state, in registration order"""
+        by_type = self._by_type
+        if by_type is None:
+            return [s for s in self._skills if s.can_handle(state)]
+        data_type = type(state.data)
+        candidates = by_type.get(data_type)
+        if candidates is None:
+            candidates = by_type[data_type] = [
+                s for s in self._skills if s.can_handle(state)
+            ]
+        return candidates
+
+    def _on_completion_error(self, e: Exception):
+        """instructor passes the exception positionally; ERROR takes it by name"""
+        self.hooks.trigger(HookPoint.ERROR, exception=e)
+
+    def cache_stats(self) -> dict:
+        """Hit/miss counts and hit rate for each configured response cache"""
+        stats = {}
+        for name, cache in (
+            ("exact", self.llm_cache),
+            ("semantic", self.semantic_cache),
+        ):
+            if cache is None:
+                continue
+            total = cache.hits + cache.misses
+            stats[name] = {
+                "hits": cache.hits,
+                "misses": cache.misses,
+                "hit_rate": cache.hits / total if total else 0.0,
+            }
+        return stats
 
     def execute(
         self, initial_state: State, max_steps: int = 10, context: dict | None = None
     ) -> State:
         """Execute skills on state"""
 
-        current_state = initial_state
-        if context:
-            current_state = current_state.with_context(**context)
-
-        # Add execution metadata
-        current_state = current_state.with_context(
-            execution_started_at=datetime.now().isoformat(), max_steps=max_steps
-        )
-        self.hooks.trigger(HookPoint.PRE_EXECUTE, state=initial_state)
+        current_state = self._begin(initial_state, max_steps, context)
 
         steps = 0
         while steps < max_steps:
+            candidates = self._candidates(current_state)
+            # No skill can handle the state: we're done
+            if not candidates:
+                break
+
             # Track if any skill was executed
             executed = False
 
-            # Try each skill
-            for skill in self.skills:
-                # Only try skills that can handle current state
-                if skill.can_handle(current_state):
-                    try:
-                        # Add pre-execution context
-                        current_state = current_state.with_context(
-                            current_step=steps,
-                            current_skill=skill.name,
-                            skill_started_at=datetime.now().isoformat(),
+            # Try each skill that can handle the current state
+            for skill in candidates:
+                try:
+                    # Add pre-execution context
+                    current_state = current_state.at_step(
+                        steps,
+                        current_skill=skill.name,
+                        **self._stamp("skill_started_at"),
+                    )
+                    self.hooks.trigger(
+                        HookPoint.SKILL_START, skill=skill, state=current_state
+                    )
+
+                    started = time.perf_counter_ns()
+                    new_state = skill._run(current_state)
+                    if new_state is not None:
+                        # Record completion on the skill's result state
+                        current_state = _clear_error(new_state).with_context(
+                            last_skill=skill.name,
+                            last_step=steps,
+                            step_duration_ns=time.perf_counter_ns() - started,
+                            **self._stamp("skill_completed_at"),
                         )
                         self.hooks.trigger(
-                            HookPoint.SKILL_START, skill=skill, state=current_state
+                            HookPoint.SKILL_END, skill=skill, state=current_state
                         )
+                        executed = True
+                        break  # Move to next state once a skill succeeds
 
-                        new_state = skill.execute(current_state)
-                        if new_state is not None:
-                            current_state = new_state
-                            # Update metadata
-                            current_state = new_state.with_context(
-                                last_skill=skill.name,
-                                last_step=steps,
-                                skill_completed_at=datetime.now().isoformat(),
-                            )
-                            self.hooks.trigger(
-                                HookPoint.SKILL_END, skill=skill, state=current_state
-                            )
-                            executed = True
-                            break  # Move to next state once a skill succeeds
+                except Exception as e:
+                    # Add Error context
+                    current_state = current_state.with_context(
+                        error=str(e), error_skill=skill.name, error_step=steps
+                    )
+                    self.hooks.trigger(
+                        HookPoint.ERROR,
+                        exception=e,
+                        skill=skill,
+                        state=current_state,
+                    )
+                    continue
+
+            # If every capable skill failed or declined, we're done
+            if not executed:
+                break
+
+            steps += 1
+
+        return self._complete(current_state, steps)
+
+    async def aexecute(
+        self, initial_state: State, max_steps: int = 10, context: dict | None = None
+    ) -> State:
+        """Async variant of execute.
+
+        At each step the skills that can handle the state run concurrently
+        (via `Skill.aexecute`), at most `max_parallel_agents` at a time; the
+        first to return a new state wins. The others are cancelled, and each
+        one that had started gets an ERROR hook with an
+        `asyncio.CancelledError` so every SKILL_START is closed.
+        """
+        current_state = self._begin(initial_state, max_steps, context)
+        semaphore = asyncio.Semaphore(self.max_parallel_agents)
+
+        async def run(skill: Skill, skill_state: State, started: set) -> State:
+            async with semaphore:
+                started.add(skill)
+                self.hooks.trigger(
+                    HookPoint.SKILL_START, skill=skill, state=skill_state
+                )
+                return await skill.aexecute(skill_state)
+
+        steps = 0
+        while steps < max_steps:
+            candidates = self._candidates(current_state)
+            if not candidates:
+                break
 
+            tasks = {}
+            started_skills = set()
+            for order, skill in enumerate(candidates):
+                skill_state = current_state.at_step(
+                    steps,
+                    current_skill=skill.name,
+                    **self._stamp("skill_started_at"),
+                )
+                task = asyncio.create_task(run(skill, skill_state, started_skills))
+                tasks[task] = (order, skill, skill_state)
+            started = time.perf_counter_ns()
+
+            winner = None
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                # Ties go to the skill listed first, as in execute
+                for task in sorted(done, key=lambda t: tasks[t][0]):
+                    _, skill, skill_state = tasks[task]
+                    try:
+                        new_state = task.result()
                     except Exception as e:
-                        # Add Error context
-                        current_state = current_state.with_context(
+                        current_state = skill_state.with_context(
                             error=str(e), error_skill=skill.name, error_step=steps
                         )
                         self.hooks.trigger(
@@ -90,17 +261,253 @@ class Agent:
                             state=current_state,
                         )
                         continue
+                    if (
+                        new_state is None
+                        or new_state is SKILL_SKIP
+                        or winner is not None
+                    ):
+                        continue
+                    winner = (skill, new_state)
 
-            # If no skill could handle the state, we're done
-            if not executed:
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                for task in sorted(pending, key=lambda t: tasks[t][0]):
+                    _, skill, skill_state = tasks[task]
+                    if skill not in started_skills:
+                        continue
+                    self.hooks.trigger(
+                        HookPoint.ERROR,
+                        exception=asyncio.CancelledError(f"{skill.name} lost the race"),
+                        skill=skill,
+                        state=skill_state.with_context(
+                            error="cancelled", error_skill=skill.name, error_step=steps
+                        ),
+                    )
+
+            if winner is None:
                 break
 
+            skill, new_state = winner
+            current_state = _clear_error(new_state).with_context(
+                last_skill=skill.name,
+                last_step=steps,
+                step_duration_ns=time.perf_counter_ns() - started,
+                **self._stamp("skill_completed_at"),
+            )
+            self.hooks.trigger(HookPoint.SKILL_END, skill=skill, state=current_state)
             steps += 1
 
-        # Add completion context
+        return self._complete(current_state, steps)
+
+    def _stamp(self, key: str) -> dict:
+        """Context entry with the current wall-clock time, if timestamps are on"""
+        return {key: datetime.now().isoformat()} if self.timestamps else {}
+
+    def _begin(
+        self, initial_state: State, max_steps: int, context: dict | None
+    ) -> State:
+        """Add caller context and execution metadata in a single update"""
+        current_state = initial_state.with_context(
+            **{
+                **(context or {}),
+                **self._stamp("execution_started_at"),
+                "max_steps": max_steps,
+            }
+        )
+        self.hooks.trigger(HookPoint.PRE_EXECUTE, state=initial_state)
+        return current_state
+
+    def _complete(self, current_state: State, steps: int) -> State:
+        """Add completion context"""
         current_state = current_state.with_context(
-            execution_completed_at=datetime.now().isoformat(), total_steps=steps
+            **self._stamp("execution_completed_at"), total_steps=steps
         )
         self.hooks.trigger(HookPoint.POST_EXECUTE, state=current_state)
-
         return current_state
+
+    def execute_batch(
+        self, states: list[State], max_steps: int = 10, context: dict | None = None
+    ) -> list[State]:
+        """Execute several states in lockstep.
+
+        At each step, states whose next skill is the same are handed to that
+        skill's `execute_batch` together, so a skill using `ask_batch` answers
+        them with one LLM call. As in `execute`, states a skill declines or
+        fails on move on to their next capable skill within the same step. If
+        a batch raises or returns the wrong number of states, its states are
+        retried one at a time, so only the states that fail on their own are
+        affected.
+        """
+        current_states = [self._begin(state, max_steps, context) for state in states]
+
+        total_steps = [0] * len(states)
+        active = list(range(len(states)))
+        for step in range(max_steps):
+            # Index -> (capable skills, position of the next one to try)
+            pending = {}
+            for i in active:
+                candidates = self._candidates(current_states[i])
+                if candidates:
+                    pending[i] = (candidates, 0)
+
+            active = []
+            while pending:
+                # Group pending states by the next skill to try
+                groups: dict[Skill, list[int]] = {}
+                for i, (candidates, position) in pending.items():
+                    groups.setdefault(candidates[position], []).append(i)
+
+                retry = {}
+                for skill, indices in groups.items():
+                    for i, new_state in zip(
+                        indices, self._run_batch(skill, indices, current_states, step)
+                    ):
+                        if new_state is not None:
+                            current_states[i] = new_state
+                            total_steps[i] += 1
+                            active.append(i)
+                            continue
+                        # Declined or failed: try the next capable skill
+                        candidates, position = pending[i]
+                        if position + 1 < len(candidates):
+                            retry[i] = (candidates, position + 1)
+                pending = retry
+
+            if not active:
+                break
+
+        return [
+            self._complete(current_state, total_steps[i])
+            for i, current_state in enumerate(current_states)
+        ]
+
+    def _run_batch(
+        self, skill: Skill, indices: list[int], current_states: list[State], step: int
+    ) -> list[State | None]:
+        """Run one skill on a group of states, updating `current_states` with
+        step and error context. Returns the completed state for each index,
+        or None where the skill declined or failed."""
+        batch = []
+        for i in indices:
+            current_states[i] = current_states[i].at_step(
+                step,
+                current_skill=skill.name,
+                **self._stamp("skill_started_at"),
+            )
+            self.hooks.trigger(
+                HookPoint.SKILL_START, skill=skill, state=current_states[i]
+            )
+            batch.append(current_states[i])
+
+        started = time.perf_counter_ns()
+        try:
+            new_states = skill.execute_batch(batch)
+            if len(new_states) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} batched states, got {len(new_states)}"
+                )
+        except Exception as e:
+            if len(batch) == 1:
+                new_states = [e]
+            else:
+                new_states = [_run_or_error(skill, state) for state in batch]
+        duration = time.perf_counter_ns() - started
+
+        results = []
+        for i, new_state in zip(indices, new_states):
+            if isinstance(new_state, Exception):
+                current_states[i] = current_states[i].with_context(
+                    error=str(new_state),
+                    error_skill=skill.name,
+                    error_step=step,
+                )
+                self.hooks.trigger(
+                    HookPoint.ERROR,
+                    exception=new_state,
+                    skill=skill,
+                    state=current_states[i],
+                )
+                new_state = None
+            elif new_state is SKILL_SKIP:
+                new_state = None
+            if new_state is not None:
+                new_state = _clear_error(new_state).with_context(
+                    last_skill=skill.name,
+                    last_step=step,
+                    step_duration_ns=duration,
+                    **self._stamp("skill_completed_at"),
+                )
+                self.hooks.trigger(HookPoint.SKILL_END, skill=skill, state=new_state)
+            results.append(new_state)
+        return results
+
+    def execute_parallel(
+        self, states: list[State], max_steps: int = 10, context: dict | None = None
+    ) -> list[State]:
+        """Execute independent states concurrently, returning results in order.
+
+        Runs its own event loop; use `aexecute_parallel` from async code.
+        """
+        return asyncio.run(self.aexecute_parallel(states, max_steps, context))
+
+    async def aexecute_parallel(
+        self, states: list[State], max_steps: int = 10, context: dict | None = None
+    ) -> list[State]:
+        """Async variant of execute_parallel"""
+        return await self._gather(
+            [partial(self.execute, state, max_steps, context) for state in states]
+        )
+
+    def fan_out(self, skills: list[Skill], state: State) -> list[State]:
+        """Run independent skills on the same state concurrently.
+
+        The skills must already be attached to this agent. Results are
+        returned in skill order, ready to be merged by a synthesizer skill.
+        Runs its own event loop; use `afan_out` from async code.
+        """
+        return asyncio.run(self.afan_out(skills, state))
+
+    async def afan_out(self, skills: list[Skill], state: State) -> list[State]:
+        """Async variant of fan_out"""
+        for skill in skills:
+            if skill.agent is not self:
+                raise RuntimeError(f"Skill {skill.name} is not attached to this agent")
+        return await self._gather(
+            [partial(self._run_skill, skill, state) for skill in skills]
+        )
+
+    async def _gather(self, calls: list[callable]) -> list:
+        """Run blocking calls in threads, at most max_parallel_agents at a time"""
+        semaphore = asyncio.Semaphore(self.max_parallel_agents)
+
+        async def run(call):
+            async with semaphore:
+                return await asyncio.to_thread(call)
+
+        return await asyncio.gather(*(run(call) for call in calls))
+
+    def _run_skill(self, skill: Skill, state: State) -> State:
+        """Execute a single skill with hooks and error context"""
+        state = state.with_context(
+            current_skill=skill.name, **self._stamp("skill_started_at")
+        )
+        self.hooks.trigger(HookPoint.SKILL_START, skill=skill, state=state)
+        started = time.perf_counter_ns()
+        try:
+            new_state = skill._run(state)
+        except Exception as e:
+            state = state.with_context(error=str(e), error_skill=skill.name)
+            self.hooks.trigger(HookPoint.ERROR, exception=e, skill=skill, state=state)
+            return state
+        if new_state is None:
+            return state
+
+        new_state = _clear_error(new_state).with_context(
+            last_skill=skill.name,
+            step_duration_ns=time.perf_counter_ns() - started,
+            **self._stamp("skill_completed_at"),
+        )
+        self.hooks.trigger(HookPoint.SKILL_END, skill=skill, state=new_state)
+        return new_state
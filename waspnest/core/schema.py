@@ -0,0 +1,73 @@
+# waspnest/core/schema.py
+import hashlib
+import json
+import math
+from functools import lru_cache
+from typing import Type
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # Optional: faster serialization for cache keys
+    orjson = None
+
+
+def stable_digest(payload: dict) -> str:
+    """SHA-256 of a JSON payload with sorted keys.
+
+    Uses orjson when installed; the stdlib fallback emits the same bytes,
+    so keys match across environments sharing a cache backend.
+    """
+    if orjson is not None:
+        data = orjson.dumps(
+            payload, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )
+    else:
+        data = _dumps(payload).encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def _dumps(obj) -> str:
+    """Compact JSON with sorted keys, written the way orjson writes it"""
+    if isinstance(obj, dict):
+        items = sorted(((_key(k), v) for k, v in obj.items()), key=lambda kv: kv[0])
+        return "{" + ",".join(f"{_dumps(k)}:{_dumps(v)}" for k, v in items) + "}"
+    if isinstance(obj, (list, tuple)):
+        return "[" + ",".join(map(_dumps, obj)) + "]"
+    if isinstance(obj, float):
+        return _float(obj)
+    return json.dumps(obj, ensure_ascii=False)
+
+
+def _key(key) -> str:
+    """Dict key as orjson's OPT_NON_STR_KEYS writes it"""
+    if isinstance(key, str):
+        return key
+    if isinstance(key, float):
+        return _float(key)
+    if key is None or isinstance(key, (bool, int)):
+        return json.dumps(key)
+    raise TypeError(f"Dict key must be str, int, float, bool or None, not {key!r}")
+
+
+def _float(value: float) -> str:
+    """Float as orjson writes it: NaN and infinities become null, exponents
+    lose the "+" and leading zeros, and 1e-05 up to 1e-04 stay decimal"""
+    if not math.isfinite(value):
+        return "null"
+    mantissa, _, exponent = repr(value).partition("e")
+    if not exponent:
+        return mantissa
+    if exponent == "-05":
+        sign = "-" if value < 0 else ""
+        return f"{sign}0.0000{mantissa.lstrip('-').replace('.', '')}"
+    return f"{mantissa}e{int(exponent)}"
+
+
+@lru_cache(maxsize=128)
+def schema_digest(response_model: Type[BaseModel]) -> str:
+    """Stable hash of a response model's schema, for use in cache keys.
+
+    Memoized per model, so the schema is only generated once.
+    """
+    return stable_digest(response_model.model_json_schema())
@@ -1,8 +1,19 @@
 # waspnest/core/skill.py
-from typing import Type, get_args, get_type_hints, Union
-from functools import wraps
-from pydantic import BaseModel
+import asyncio
+import inspect
+import threading
+import time
+from types import UnionType
+from typing import Callable, Iterator, Type, get_args, get_origin, get_type_hints, Union
+from functools import lru_cache, wraps
+from pydantic import BaseModel, create_model
 from .state import State
+from ..hooks import HookPoint
+
+# Returned by a skill to decline a state without raising. Agent.execute and
+# execute_batch then try the next capable skill (aexecute keeps racing the
+# others), as when execute returns None
+SKILL_SKIP = object()
 
 
 def skill(func: callable = None):
@@ -20,113 +31,488 @@ def skill(func: callable = None):
         if is_complex(state.data):
             return State(DetailedResponse(answer="Detailed..."))
         return State(SimpleResponse(answer="Simple..."))
+
+    @skill
+    def draft(self, state: State[Query]) -> State[Response]:
+        for partial in self.ask_stream(state.data.text, Response):
+            yield State(partial)  # Each yielded state fires SKILL_PROGRESS
+        yield State(Response.model_validate(partial.model_dump()))
     ```
+
+    A generator skill yields intermediate states; the last one is its result
+    and is validated against the return annotation.
     """
 
-    @wraps(func)
-    def wrapper(self, state: State):
-        # Get type hints
-        hints = get_type_hints(func)
+    # Resolve annotations once, at decoration time
+    hints = get_type_hints(func)
 
-        # Extract the input type from State[T]
-        state_type = hints["state"]
-        if hasattr(state_type, "__origin__") and state_type.__origin__ is State:
-            input_type = get_args(state_type)[0]
-        else:
-            raise TypeError(f"State type annotation must be State[T], got {state_type}")
-
-        # Extract output type(s) from return type State[T]
-        return_type = hints["return"]
-        if hasattr(return_type, "__origin__") and return_type.__origin__ is State:
-            output_type = get_args(return_type)[0]
-            # Handle union types
-            if hasattr(output_type, "__origin__") and output_type.__origin__ is Union:
-                output_types = get_args(output_type)
-            else:
-                output_types = (output_type,)
+    # Extract the input type from State[T]
+    state_type = hints["state"]
+    if get_origin(state_type) is State:
+        input_type = get_args(state_type)[0]
+    else:
+        raise TypeError(f"State type annotation must be State[T], got {state_type}")
+
+    # Extract output type(s) from return type State[T]
+    return_type = hints.get("return")
+    if get_origin(return_type) is State:
+        output_type = get_args(return_type)[0]
+        # Handle union types (Union[A, B] and A | B)
+        if get_origin(output_type) in (Union, UnionType):
+            output_types = get_args(output_type)
         else:
-            raise TypeError(f"Return type must be State[T], got {return_type}")
+            output_types = (output_type,)
+    else:
+        raise TypeError(f"Return type must be State[T], got {return_type}")
 
-        # Validate input is a Pydantic model
-        if not isinstance(state.data, BaseModel):
-            raise TypeError(f"Input must be a Pydantic model, got {type(state.data)}")
+    # Declared types must be Pydantic models, so the per-call type checks
+    # imply it
+    for declared in (input_type, *output_types):
+        if not (isinstance(declared, type) and issubclass(declared, BaseModel)):
+            raise TypeError(f"State types must be Pydantic models, got {declared}")
 
-        # Validate input matches expected type
-        if not isinstance(state.data, input_type):
-            raise TypeError(f"Expected input type {input_type}, got {type(state.data)}")
+    type_names = [t.__name__ for t in output_types]
+    expected = (
+        type_names[0] if len(type_names) == 1 else f"one of: {', '.join(type_names)}"
+    )
 
-        # Execute skill
-        result = func(self, state)
+    # Exact-type checks below short-circuit the common case; isinstance
+    # still accepts subclasses
+    def check_input(state: State):
+        # Validate input matches expected type (a Pydantic model, checked above)
+        data = state.data
+        if type(data) is not input_type and not isinstance(data, input_type):
+            raise TypeError(f"Expected input type {input_type}, got {type(data)}")
 
-        # Validate output
-        if not isinstance(result, State):
+    def check_state(result):
+        if type(result) is not State and not isinstance(result, State):
             raise TypeError(f"Skill must return a State, got {type(result)}")
 
-        if not isinstance(result.data, BaseModel):
-            raise TypeError(f"Output must be a Pydantic model, got {type(result.data)}")
-
+    def check_output(result: State):
         # Validate output matches one of the expected types
-        if not isinstance(result.data, output_types):
-            type_names = [t.__name__ for t in output_types]
-            expected = (
-                type_names[0]
-                if len(type_names) == 1
-                else f"one of: {', '.join(type_names)}"
-            )
-            raise TypeError(
-                f"Output must be {expected}, got {type(result.data).__name__}"
-            )
+        data = result.data
+        if type(data) not in output_types and not isinstance(data, output_types):
+            raise TypeError(f"Output must be {expected}, got {type(data).__name__}")
 
-        return result
+    if inspect.isgeneratorfunction(func):
+
+        @wraps(func)
+        def wrapper(self, state: State):
+            check_input(state)
+            result = None
+            for result in func(self, state):
+                check_state(result)
+                yield result
+            if result is None:
+                raise TypeError("Generator skill must yield at least one State")
+            check_output(result)
 
-    # Store the input type on the wrapper for can_handle check
-    hints = get_type_hints(func)
-    state_type = hints["state"]
-    if hasattr(state_type, "__origin__") and state_type.__origin__ is State:
-        wrapper.input_type = get_args(state_type)[0]
     else:
-        raise TypeError(f"State type annotation must be State[T], got {state_type}")
+
+        @wraps(func)
+        def wrapper(self, state: State):
+            check_input(state)
+            result = func(self, state)
+            if result is SKILL_SKIP:
+                return result
+            check_state(result)
+            check_output(result)
+            return result
+
+    # Store the resolved types on the wrapper for can_handle checks
+    wrapper.input_type = input_type
+    wrapper.output_types = output_types
+
+    return wrapper
+
+
+@lru_cache(maxsize=128)
+def _batched_model(response_model: Type[BaseModel]) -> Type[BaseModel]:
+    """Wrapper model holding one response per batched prompt"""
+    return create_model(
+        f"Batched{response_model.__name__}", items=(list[response_model], ...)
+    )
+
+
+def _memoized(execute: Callable) -> Callable:
+    """Memoize a skill's execute per instance, keyed on the input data.
+
+    Only the result data is stored; a hit returns it (copied) on the calling
+    state, so context reflects the current run. None and SKILL_SKIP results
+    are not stored.
+    """
+    if inspect.isgeneratorfunction(execute):
+        raise TypeError("Generator skills cannot be cacheable")
+
+    @wraps(execute)
+    def wrapper(self, state: State):
+        data = state.data
+        key = (type(data), data.model_dump_json())
+        memo = self._memo
+        cached = memo.get(key)
+        if cached is not None:
+            return state.with_data(cached.model_copy())
+
+        result = execute(self, state)
+        if result is not None and result is not SKILL_SKIP:
+            with self._memo_lock:
+                if key not in memo and len(memo) >= self.memo_size:
+                    del memo[next(iter(memo))]  # Drop the oldest entry
+                memo[key] = result.data
+        return result
 
     return wrapper
 
 
 class Skill:
-    """Base class for skills that transform states."""
+    """Base class for skills that transform states.
+
+    Subclasses declared with `cacheable=True` memoize `execute` per instance
+    on the input data, for skills that are a pure function of it.
+
+    Skill declares `__slots__`; a subclass still gets a per-instance
+    `__dict__` unless it declares its own (`__slots__ = ()` if it adds no
+    attributes).
+    """
+
+    __slots__ = ("name", "agent", "_memo", "_memo_lock")
+
+    # Declared types of the @skill-decorated execute, cached per class
+    input_type: type | None = None
+    output_types: tuple[type, ...] | None = None
+
+    cacheable: bool = False
+    # Entries kept per cacheable skill instance
+    memo_size: int = 256
+
+    def __init_subclass__(cls, cacheable: bool | None = None, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cacheable is not None:
+            cls.cacheable = cacheable
+        if cls.cacheable and "execute" in cls.__dict__:
+            cls.execute = _memoized(cls.execute)
+        cls.input_type = getattr(cls.execute, "input_type", None)
+        cls.output_types = getattr(cls.execute, "output_types", None)
 
     def __init__(self, name: str = None):
         self.name = name or self.__class__.__name__
         self.agent = None
+        self._memo: dict[tuple[type, str], BaseModel] = {}
+        self._memo_lock = threading.Lock()
 
     def can_handle(self, state: State) -> bool:
         """Check if this skill can handle the given state."""
-        execute = getattr(self, "execute")
-        if hasattr(execute, "input_type"):
-            return isinstance(state.data, execute.input_type)
-        return True  # If no type info, assume it can handle it
+        input_type = self.input_type
+        if input_type is None:
+            return True  # If no type info, assume it can handle it
+        data = state.data
+        return type(data) is input_type or isinstance(data, input_type)
 
     def execute(self, state: State) -> State:
         """Execute this skill on a state"""
         raise NotImplementedError
 
+    async def aexecute(self, state: State) -> State:
+        """Async variant of execute, used by Agent.aexecute.
+
+        Runs `execute` in a worker thread; override with `aask` so that a
+        cancelled skill also cancels its LLM request.
+        """
+        return await asyncio.to_thread(self._run, state)
+
+    def execute_batch(self, states: list[State]) -> list[State]:
+        """Execute this skill on several states.
+
+        Override with `ask_batch` to answer all states in one LLM call.
+        """
+        return [self._run(state) for state in states]
+
+    def _run(self, state: State) -> State:
+        """Execute, draining generator skills and firing SKILL_PROGRESS for
+        each state they yield"""
+        result = self.execute(state)
+        if result is SKILL_SKIP:
+            return None
+        if not inspect.isgenerator(result):
+            return result
+
+        trigger = self.agent.hooks.trigger if self.agent else None
+        state = None
+        for state in result:
+            if trigger is not None:
+                trigger(HookPoint.SKILL_PROGRESS, skill=self, state=state)
+        return state
+
     def ask(
         self,
         prompt: str,
         response_model: Type[BaseModel],
         system_prompt: str | None = None,
+        cache_policy: str = "semantic",
+        on_token: Callable[[str], None] | None = None,
+        **kwargs,
+    ) -> BaseModel:
+        """Helper for LLM interactions.
+
+        `cache_policy` selects the cache tiers consulted for deterministic calls:
+        "semantic" (exact, then semantic if configured), "exact", or "off".
+
+        The response is streamed when `on_token` is given or LLM_TOKEN hooks
+        are registered. Deltas are fragments of the response JSON, flushed
+        every ~50 chars or 100ms.
+        """
+        cached, cache_keys = self._cache_lookup(
+            prompt, response_model, system_prompt, cache_policy, kwargs
+        )
+        if cached is not None:
+            return cached
+
+        if on_token is not None or self.agent.hooks.has(HookPoint.LLM_TOKEN):
+            result = self._stream(
+                prompt, response_model, system_prompt, on_token, **kwargs
+            )
+        else:
+            result = self.agent.client.chat.completions.create(
+                model=self.agent.model,
+                messages=self._messages(prompt, system_prompt),
+                response_model=response_model,
+                **kwargs,
+            )
+
+        self._cache_store(prompt, cache_keys, result)
+        return result
+
+    async def aask(
+        self,
+        prompt: str,
+        response_model: Type[BaseModel],
+        system_prompt: str | None = None,
+        cache_policy: str = "semantic",
         **kwargs,
     ) -> BaseModel:
-        """Helper for LLM interactions"""
+        """Async variant of ask.
+
+        Uses the agent's `async_client` when configured, so a cancelled call
+        aborts its request; otherwise runs `ask` in a worker thread.
+        """
         if not self.agent:
             raise RuntimeError("Skill must be attached to an agent")
+        if self.agent.async_client is None:
+            return await asyncio.to_thread(
+                self.ask, prompt, response_model, system_prompt, cache_policy, **kwargs
+            )
 
+        cached, cache_keys = self._cache_lookup(
+            prompt, response_model, system_prompt, cache_policy, kwargs
+        )
+        if cached is not None:
+            return cached
+
+        result = await self.agent.async_client.chat.completions.create(
+            model=self.agent.model,
+            messages=self._messages(prompt, system_prompt),
+            response_model=response_model,
+            **kwargs,
+        )
+
+        self._cache_store(prompt, cache_keys, result)
+        return result
+
+    def _messages(self, prompt: str, system_prompt: str | None) -> list[dict]:
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
+        return messages
 
-        return self.agent.client.chat.completions.create(
+    def _cache_lookup(
+        self,
+        prompt: str,
+        response_model: Type[BaseModel],
+        system_prompt: str | None,
+        cache_policy: str,
+        kwargs: dict,
+    ) -> tuple[BaseModel | None, tuple]:
+        """Return a cached response (or None) and the keys to store a fresh one"""
+        if not self.agent:
+            raise RuntimeError("Skill must be attached to an agent")
+        if cache_policy not in ("exact", "semantic", "off"):
+            raise ValueError(f"Unknown cache policy: {cache_policy}")
+
+        # Deterministic calls (temperature 0 or unset) are served from cache
+        cacheable = (
+            cache_policy != "off"
+            and kwargs.get("temperature") in (0, None)
+            and isinstance(response_model, type)
+            and issubclass(response_model, BaseModel)
+        )
+        cache = self.agent.llm_cache if cacheable else None
+        semantic = (
+            self.agent.semantic_cache
+            if cacheable and cache_policy == "semantic"
+            else None
+        )
+
+        cache_key = None
+        if cache is not None:
+            try:
+                cache_key = cache.make_key(
+                    prompt, response_model, system_prompt, self.agent.model, kwargs
+                )
+            except TypeError:  # Arguments that can't be serialized can't be keyed
+                return None, (None, None)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return response_model.model_validate_json(cached), (None, None)
+
+        scope = None
+        if semantic is not None:
+            try:
+                scope = semantic.scope_key(
+                    response_model, system_prompt, self.agent.model, kwargs
+                )
+            except TypeError:
+                return None, (cache_key, None)
+            cached = semantic.get(scope, prompt)
+            if cached is not None:
+                if cache_key is not None:
+                    cache.set(cache_key, cached)
+                return response_model.model_validate_json(cached), (None, None)
+
+        return None, (cache_key, scope)
+
+    def _cache_store(self, prompt: str, cache_keys: tuple, result: BaseModel):
+        cache_key, scope = cache_keys
+        if cache_key is None and scope is None:
+            return
+        dumped = result.model_dump_json()
+        if cache_key is not None:
+            self.agent.llm_cache.set(cache_key, dumped)
+        if scope is not None:
+            self.agent.semantic_cache.set(scope, prompt, dumped)
+
+    def ask_stream(
+        self,
+        prompt: str,
+        response_model: Type[BaseModel],
+        system_prompt: str | None = None,
+        **kwargs,
+    ) -> Iterator[BaseModel]:
+        """Yield progressively more complete partial responses as they stream.
+
+        Fields not yet received are None. Streamed calls bypass the cache.
+        """
+        if not self.agent:
+            raise RuntimeError("Skill must be attached to an agent")
+        yield from self.agent.client.chat.completions.create_partial(
             model=self.agent.model,
-            messages=messages,
+            messages=self._messages(prompt, system_prompt),
             response_model=response_model,
             **kwargs,
         )
+
+    def _stream(
+        self,
+        prompt: str,
+        response_model: Type[BaseModel],
+        system_prompt: str | None,
+        on_token: Callable[[str], None] | None,
+        **kwargs,
+    ) -> BaseModel:
+        """Stream partial responses, emitting batched JSON text deltas"""
+        hooks = self.agent.hooks
+        buffer = ""
+        emitted = ""
+        last_flush = time.monotonic()
+
+        def flush():
+            nonlocal buffer, last_flush
+            if buffer:
+                hooks.trigger(HookPoint.LLM_TOKEN, skill=self, delta=buffer)
+                if on_token is not None:
+                    on_token(buffer)
+                buffer = ""
+            last_flush = time.monotonic()
+
+        partial = None
+        for partial in self.ask_stream(prompt, response_model, system_prompt, **kwargs):
+            # Closing quotes/brackets move as fields grow, so only the text
+            # before them is a stable prefix of the final JSON
+            text = partial.model_dump_json(exclude_none=True).rstrip('"}] ')
+            if text.startswith(emitted):
+                buffer += text[len(emitted) :]
+                emitted = text
+            if len(buffer) >= 50 or time.monotonic() - last_flush > 0.1:
+                flush()
+        flush()
+
+        if partial is None:
+            raise RuntimeError("LLM stream ended without a response")
+        return response_model.model_validate(partial.model_dump())
+
+    def ask_many(
+        self,
+        prompts: list[str],
+        response_model: Type[BaseModel],
+        system_prompt: str | None = None,
+        max_concurrency: int = 16,
+        **kwargs,
+    ) -> list[BaseModel]:
+        """Answer several prompts with concurrent, independent LLM calls.
+
+        Unlike `ask_batch`, whose latency grows with the total output of one
+        combined decode, the latency here is that of the slowest request.
+        Runs its own event loop; use `aask_many` from async code.
+        """
+        return asyncio.run(
+            self.aask_many(
+                prompts, response_model, system_prompt, max_concurrency, **kwargs
+            )
+        )
+
+    async def aask_many(
+        self,
+        prompts: list[str],
+        response_model: Type[BaseModel],
+        system_prompt: str | None = None,
+        max_concurrency: int = 16,
+        **kwargs,
+    ) -> list[BaseModel]:
+        """Async variant of ask_many, e.g. for an `aexecute` override"""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def ask_one(prompt: str) -> BaseModel:
+            async with semaphore:
+                return await self.aask(prompt, response_model, system_prompt, **kwargs)
+
+        return await asyncio.gather(*(ask_one(prompt) for prompt in prompts))
+
+    def ask_batch(
+        self,
+        prompts: list[str],
+        response_model: Type[BaseModel],
+        system_prompt: str | None = None,
+        **kwargs,
+    ) -> list[BaseModel]:
+        """Answer several prompts with a single LLM call, one response per prompt"""
+        if not prompts:
+            return []
+
+        instruction = (
+            "You will receive numbered inputs. Return exactly one object per "
+            "numbered input, in the same order."
+        )
+        result = self.ask(
+            prompt="\n\n".join(f"{i}. {p}" for i, p in enumerate(prompts, 1)),
+            response_model=_batched_model(response_model),
+            system_prompt=f"{system_prompt}\n\n{instruction}"
+            if system_prompt
+            else instruction,
+            **kwargs,
+        )
+
+        if len(result.items) != len(prompts):
+            raise ValueError(
+                f"Expected {len(prompts)} batched responses, got {len(result.items)}"
+            )
+        return result.items
@@ -1,26 +1,87 @@
 # waspnest/core/state.py
-from typing import Generic, TypeVar, Optional
-from dataclasses import dataclass
+from collections import ChainMap
+from types import MappingProxyType
+from typing import Generic, Mapping, TypeVar
+from dataclasses import dataclass, field
 from pydantic import BaseModel
 
 T = TypeVar("T", bound=BaseModel)
 
+# Shared read-only default for metadata and context. dataclasses rejects
+# unhashable defaults, so it is handed out through a factory.
+_EMPTY: Mapping = MappingProxyType({})
 
-@dataclass(frozen=True)
+
+def _empty() -> Mapping:
+    return _EMPTY
+
+
+class Context(ChainMap):
+    """Layered context: each update is a new layer over the shared parent.
+
+    Compares and prints like a plain dict. Use `dict(context)` where a real
+    dict is required (e.g. JSON serialization).
+    """
+
+    # Collapse the layers once lookups would walk this many maps
+    MAX_DEPTH = 16
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+@dataclass(frozen=True, slots=True)
 class State(Generic[T]):
     """A wrapper around state data that includes metadata and context."""
 
     data: T
-    metadata: Optional[dict] = None
-    context: Optional[dict] = None
+    metadata: Mapping | None = field(default_factory=_empty)
+    context: Mapping | None = field(default_factory=_empty)
+    current_step: int | str = "initial"  # Set by Agent before each skill runs
 
     def __post_init__(self):
-        """Initialize with empty dicts if None"""
-        # Using object.__setattr__ because the class is frozen
-        object.__setattr__(self, "metadata", self.metadata or {})
-        object.__setattr__(self, "context", self.context or {})
+        # Accept explicit None as "empty"; frozen, hence object.__setattr__
+        if self.metadata is None:
+            object.__setattr__(self, "metadata", _EMPTY)
+        if self.context is None:
+            object.__setattr__(self, "context", _EMPTY)
+
+    def with_data(self, data: T) -> "State[T]":
+        """Creates new state with new data, sharing context and metadata"""
+        return State(
+            data=data,
+            metadata=self.metadata,
+            context=self.context,
+            current_step=self.current_step,
+        )
 
     def with_context(self, **updates) -> "State[T]":
         """Creates new state with updated context"""
-        new_context = {**self.context, **updates}
-        return State(data=self.data, metadata=self.metadata.copy(), context=new_context)
+        return self.at_step(self.current_step, **updates)
+
+    def without_context(self, *keys: str) -> "State[T]":
+        """Creates new state with the given context keys removed"""
+        context = {k: v for k, v in self.context.items() if k not in keys}
+        return State(
+            data=self.data,
+            metadata=self.metadata,
+            context=Context(context),
+            current_step=self.current_step,
+        )
+
+    def at_step(self, step: int | str, /, **updates) -> "State[T]":
+        """Creates new state at the given step with updated context"""
+        context = self.context
+        if not isinstance(context, Context):
+            # Copy the caller's mapping once; later layers share this copy
+            new_context = Context(updates, dict(context))
+        elif len(context.maps) >= Context.MAX_DEPTH:
+            new_context = Context({**context, **updates})
+        else:
+            new_context = context.new_child(updates)
+        return State(
+            data=self.data,
+            metadata=self.metadata,
+            context=new_context,
+            current_step=step,
+        )
@@ -1,26 +1,70 @@
-from enum import Enum
+from enum import IntEnum
 
 
-class HookPoint(Enum):
-    PRE_EXECUTE = "pre_execute"
-    POST_EXECUTE = "post_execute"
-    SKILL_START = "skill_start"
-    SKILL_END = "skill_end"
-    ERROR = "error"
-    LLM_REQUEST = "llm_request"  # Maps to instructor's completion:kwargs
+class HookPoint(IntEnum):
+    """Hook points, numbered so they can index the registry directly"""
+
+    PRE_EXECUTE = 0
+    SKILL_START = 1
+    SKILL_END = 2
+    POST_EXECUTE = 3
+    LLM_REQUEST = 4  # Maps to instructor's completion:kwargs
+    LLM_TOKEN = 5  # Batched JSON text deltas of a streamed structured response
+    ERROR = 6
+    SKILL_PROGRESS = 7  # Each state yielded by a generator skill
+
+
+def _noop(**kwargs):
+    pass
 
 
 class Hooks:
     def __init__(self):
-        self.hooks: dict[HookPoint, list[callable]] = {point: [] for point in HookPoint}
+        # Callbacks per hook point, indexed by HookPoint value
+        self._hooks: list[tuple[callable, ...]] = [() for _ in HookPoint]
+        # One dispatch function per hook point, rebuilt by on()
+        self._compiled: list[callable] = [_noop for _ in HookPoint]
+
+    @property
+    def hooks(self) -> tuple[tuple[callable, ...], ...]:
+        """Registered callbacks indexed by hook point (read-only; use on())"""
+        return tuple(self._hooks)
+
+    def has(self, point: HookPoint) -> bool:
+        """Whether any callback is registered for a hook point"""
+        return self._compiled[point] is not _noop
 
     def on(self, point: HookPoint, callback: callable):
-        self.hooks[point].append(callback)
+        self._hooks[point] = callbacks = (*self._hooks[point], callback)
+        self._compiled[point] = self._compile(point, callbacks)
+
+    def _compile(self, point: HookPoint, callbacks: tuple[callable, ...]) -> callable:
+        """Build the dispatch function for a fixed snapshot of callbacks"""
+        report = point is not HookPoint.ERROR
+
+        def fire(**kwargs):
+            errors = None
+            for hook in callbacks:
+                try:
+                    hook(**kwargs)
+                except Exception as e:
+                    if errors is None:
+                        errors = []
+                    errors.append((hook, e))
+            if errors and report:
+                hook, exception = errors[0]
+                self.trigger(
+                    HookPoint.ERROR, exception=exception, hook=hook, errors=errors
+                )
+
+        return fire
 
     def trigger(self, point: HookPoint, **kwargs):
-        """Trigger all callbacks for a hook point"""
-        for hook in self.hooks[point]:
-            try:
-                hook(**kwargs)
-            except Exception as e:
-                self.trigger(HookPoint.ERROR, exception=e, hook=hook)
+        """Trigger all callbacks for a hook point.
+
+        Failing callbacks don't stop the others; their errors are reported
+        in one ERROR trigger (`exception`/`hook` for the first failure,
+        `errors` with every `(hook, exception)` pair). Failures inside ERROR
+        hooks are not re-reported.
+        """
+        self._compiled[point](**kwargs)